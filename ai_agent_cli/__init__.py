@@ -1,10 +1,7 @@
 """AI Agent CLI - Autonomous Development System"""
 
-from .agent import AIAgent
-from .config import Config
-from .ai_service import AnthropicService
-from .reasoning import ReasoningEngine
-from .multi_agent.core import AgentNetwork
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "0.1.0"
 __author__ = "Francis Kiptengwer Chemorion"
@@ -16,4 +13,34 @@ __all__ = [
     "AnthropicService",
     "ReasoningEngine",
     "AgentNetwork"
-]
\ No newline at end of file
+]
+
+# Public names and the submodules that define them; each is imported on
+# first access (PEP 562) so that importing the package stays cheap
+_LAZY_ATTRIBUTES = {
+    "AIAgent": ".agent",
+    "Config": ".config",
+    "AnthropicService": ".ai_service",
+    "ReasoningEngine": ".reasoning",
+    "AgentNetwork": ".multi_agent.core",
+}
+
+if TYPE_CHECKING:
+    from .agent import AIAgent
+    from .config import Config
+    from .ai_service import AnthropicService
+    from .reasoning import ReasoningEngine
+    from .multi_agent.core import AgentNetwork
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
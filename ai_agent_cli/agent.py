@@ -4,57 +4,156 @@ import asyncio
 import click
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-import logging
+from typing import Optional, Dict, Any
 from rich.console import Console
-from rich.progress import Progress
 
 from .config import Config
-from .ai_service import AnthropicService
-from .reasoning import ReasoningEngine
-from .utils import setup_logging, create_github_client, analyze_repository
-from .multi_agent.core import AgentNetwork
 
 console = Console()
 
 class AIAgent:
     def __init__(self, config: Config):
         """Initialize the AI Agent with configuration."""
+        # Imported here so the CLI (and --help) starts without loading the
+        # Anthropic, GitHub and scraping stacks
+        from .ai_service import AnthropicService
+        from .batch import BatchDispatcher
+        from .cache import ResponseCache
+        from .context import ContextBuilder
+        from .http_cache import HTTPCache
+        from .rate_limit import configure_limiter
+        from .reasoning import ReasoningEngine
+        from .github_client import GitHubClient
+        from .utils import setup_logging
+        from .multi_agent.core import AgentNetwork
+        from .multi_agent.memory import SharedKnowledgeBase
+        from .multi_agent.storage import create_backend
+
         self.config = config
+        logging_settings = config.get("logging", {})
         self.logger = setup_logging(
-            Path(config.get("logging", {}).get("file")),
-            config.get("logging", {}).get("level", "INFO")
+            Path(logging_settings.get("file")),
+            logging_settings.get("level", "INFO"),
+            max_size=logging_settings.get("max_size", 10485760),
+            backup_count=logging_settings.get("backup_count", 5),
+            compress_backups=logging_settings.get("compress_backups", False)
+        )
+        # Credentials are checked in start(), alongside agent start-up
+        github_settings = config.get("github", {})
+        self.github = GitHubClient(
+            config.get("github_token"),
+            api_url=github_settings.get("api_url", "https://api.github.com"),
+            graphql_url=github_settings.get("graphql_url"),
+            metadata_batch_size=github_settings.get("metadata_batch_size", 50)
         )
-        self.github = create_github_client(config.get("github_token"))
+        page_cache_settings = github_settings.get("page_cache", {})
+        http_cache = None
+        if page_cache_settings.get("enabled", True):
+            http_cache = HTTPCache(
+                config.config_dir / "http_cache",
+                max_age=page_cache_settings.get("max_age_seconds", 300),
+                max_bytes=page_cache_settings.get("max_disk_mb", 100) * 1024 * 1024
+            )
         self.workspace = Path(config.get("workspace_dir"))
         self.workspace.mkdir(parents=True, exist_ok=True)
         
         # Initialize AI services
-        self.ai = AnthropicService(config.get("anthropic_token"))
+        for upstream, limits in config.get("rate_limits", {}).items():
+            configure_limiter(upstream, **limits)
+
+        llm_settings = config.get("llm", {})
+        cache_settings = llm_settings.get("cache", {})
+        response_cache = None
+        if cache_settings.get("enabled", True):
+            response_cache = ResponseCache(
+                max_entries=cache_settings.get("memory_entries", 256),
+                ttl=cache_settings.get("ttl_seconds", 3600),
+                max_disk_bytes=cache_settings.get("max_disk_mb", 50) * 1024 * 1024
+            )
+        self.ai = AnthropicService(
+            config.get("anthropic_token"),
+            max_concurrency=llm_settings.get("max_concurrency", 8),
+            cache=response_cache
+        )
+        batch_settings = llm_settings.get("batch", {})
+        if batch_settings.get("enabled", False):
+            self.ai.transport.batcher = BatchDispatcher(
+                self.ai.transport,
+                max_batch_size=batch_settings.get("max_batch_size", 100),
+                max_wait=batch_settings.get("max_wait_seconds", 5),
+                poll_interval=batch_settings.get("poll_interval_seconds", 30)
+            )
+        context_settings = config.get("context", {})
+        context_builder = ContextBuilder(
+            budget=context_settings.get("max_prompt_tokens", 4000),
+            transport=self.ai.transport if context_settings.get("summarize", True) else None,
+            cache_size=context_settings.get("summary_cache_size", 128)
+        )
         self.reasoning = ReasoningEngine(
-            self.ai.client,
-            self.workspace / ".memory"
+            self.ai.transport,
+            self.workspace / ".memory",
+            context_builder=context_builder
         )
         
+        # Fill in settings missing from older config files from the
+        # shipped defaults, so there is a single source for each value
+        memory_settings = {
+            **config.get_default_config()["memory"],
+            **config.get("memory", {})
+        }
+        storage_path = Path.home() / ".ai_agent_cli" / "knowledge"
+        self.shared_memory = SharedKnowledgeBase(
+            storage_path,
+            backend=create_backend(storage_path, memory_settings),
+            flush_interval_ms=memory_settings["flush_interval_ms"],
+            flush_max_writes=memory_settings["flush_max_writes"]
+        )
+
         # Initialize agent network if multi-agent mode is enabled
         if config.get("multi_agent_mode", True):
-            self.agent_network = AgentNetwork(self.ai.client)
+            self.agent_network = AgentNetwork(
+                self.ai.transport,
+                mailbox_size=config.get("network", {}).get("mailbox_size", 100),
+                shared_memory=self.shared_memory,
+                context_builder=context_builder,
+                agent_settings=config.get("agent_settings", {}),
+                max_concurrent_projects=config.get("max_concurrent_projects", 3),
+                github=self.github,
+                http_cache=http_cache
+            )
         else:
             self.agent_network = None
+            # Single-agent plans draw on what earlier multi-agent runs stored
+            self.reasoning.attach_knowledge(self.shared_memory)
 
     async def start(self):
         """Start the AI agent in appropriate mode."""
         try:
             self.logger.info("Starting AI Agent...")
             
+            # Check GitHub credentials while the agents start up
+            auth_check = asyncio.ensure_future(self.github.verify())
             if self.agent_network:
-                await self._start_multi_agent_mode()
+                run = asyncio.ensure_future(self._start_multi_agent_mode())
             else:
-                await self._start_single_agent_mode()
+                run = asyncio.ensure_future(self._start_single_agent_mode())
+            try:
+                await auth_check
+            except Exception:
+                run.cancel()
+                raise
+            quota = self.github.rate_limit
+            self.logger.info(f"GitHub API quota: {quota['remaining']}/{quota['limit']} requests left")
+            await run
                 
         except Exception as e:
             self.logger.error(f"Critical error in agent execution: {str(e)}")
             raise
+        finally:
+            if not self.agent_network:
+                # The agent network closes the knowledge base itself
+                await self.shared_memory.aclose()
+            await self.github.close()
 
     async def _start_multi_agent_mode(self):
         """Start in multi-agent mode with specialized agents."""
@@ -67,7 +166,7 @@ class AIAgent:
         
         initial_context = {
             "workspace": str(self.workspace),
-            "github_username": self.github.get_user().login,
+            "github_username": await self.github.login(),
             "current_time": datetime.now().isoformat()
         }
         
@@ -76,29 +175,26 @@ class AIAgent:
             initial_context
         )
         
+        from .scheduler import PlanScheduler
+
+        scheduler = PlanScheduler(
+            self._run_step,
+            self.reasoning.adapt_plan,
+            max_concurrency=self.config.get("max_concurrent_projects", 3)
+        )
         try:
-            while plan.status == "in_progress":
-                step = plan.steps[plan.current_step]
-                self.logger.info(f"Executing step: {step}")
-                
-                try:
-                    await self._execute_step(step)
-                except Exception as e:
-                    self.logger.error(f"Step failed: {str(e)}")
-                    plan = await self.reasoning.adapt_plan(plan, {
-                        "error": str(e),
-                        "step": step
-                    })
-                    continue
-                
-                plan.current_step += 1
-                if plan.current_step >= len(plan.steps):
-                    plan.status = "completed"
-                    
+            plan = await scheduler.run(plan)
+            if plan.status == "failed":
+                self.logger.error(f"Plan failed: {plan.context.get('error', 'steps kept failing')}")
         except Exception as e:
             self.logger.error(f"Error in single agent mode: {str(e)}")
             raise
 
+    async def _run_step(self, step: Dict[str, Any]):
+        """Log and execute one plan step; the scheduler handles failures."""
+        self.logger.info(f"Executing step: {step}")
+        return await self._execute_step(step)
+
     async def _execute_step(self, step: Dict[str, Any]):
         """Execute a single step of the plan."""
         if step["type"] == "analyze_trends":
@@ -137,7 +233,7 @@ class AIAgent:
         self.logger.info("Analyzing trends...")
         return await self.ai.analyze_project_opportunity({
             "workspace": str(self.workspace),
-            "github_username": self.github.get_user().login,
+            "github_username": await self.github.login(),
             "time": datetime.now().isoformat()
         })
 
@@ -2,33 +2,38 @@
 
 import os
 import re
-from typing import List, Dict, Any
-import anthropic
-from anthropic import Anthropic
+import logging
+from typing import List, Dict, Any, Optional
 import json
 
+from .cache import ResponseCache
+from .transport import LLMTransport, DEFAULT_MODEL
+
 class AnthropicService:
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        max_concurrency: int = 8,
+        cache: Optional[ResponseCache] = None
+    ):
         """Initialize the Anthropic service."""
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("Anthropic API key is required")
-        self.client = Anthropic(api_key=self.api_key)
-        self.model = "claude-3-sonnet-20240229"
+        self.transport = LLMTransport(
+            api_key=self.api_key,
+            max_concurrency=max_concurrency,
+            cache=cache
+        )
+        self.client = self.transport.client
+        self.model = DEFAULT_MODEL
 
     async def analyze_project_opportunity(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze project opportunities with context."""
         try:
             prompt = self._create_analysis_prompt(context)
-            response = self.client.messages.create(
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }],
-                model=self.model,
-                max_tokens=2000
-            )
-            return self._parse_structured_response(response.content)
+            response = await self.transport.complete(prompt, self.model, max_tokens=2000)
+            return self._parse_structured_response(response)
         except Exception as e:
             logging.error(f"Error in analyze_project_opportunity: {str(e)}")
             raise
@@ -36,22 +41,14 @@ class AnthropicService:
     async def generate_project_code(self, spec: Dict[str, Any], file_path: str) -> str:
         """Generate code for a specific project file."""
         prompt = self._create_code_generation_prompt(spec, file_path)
-        response = await self.client.messages.create(
-            model=self.model,
-            max_tokens=3000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return self._extract_code_blocks(response.content)
+        response = await self.transport.complete(prompt, self.model, max_tokens=3000)
+        return self._extract_code_blocks(response)
 
     async def review_code(self, code: str) -> List[Dict[str, Any]]:
         """Review code and provide structured feedback."""
         prompt = self._create_code_review_prompt(code)
-        response = await self.client.messages.create(
-            model=self.model,
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return self._parse_review_response(response.content)
+        response = await self.transport.complete(prompt, self.model, max_tokens=2000)
+        return self._parse_review_response(response)
 
     def _create_analysis_prompt(self, context: Dict[str, Any]) -> str:
         """Create a detailed prompt for project analysis."""
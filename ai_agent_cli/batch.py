@@ -0,0 +1,141 @@
+"""Message batch dispatch for work that is not time-critical."""
+
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .transport import DEFAULT_MODEL, LLMTransport, response_text
+
+
+class BatchRequestError(Exception):
+    """A request inside a message batch did not succeed."""
+
+
+class BatchDispatcher:
+    """Collect prompts and send them to the model as one message batch.
+
+    Prompts submitted within ``max_wait`` seconds of each other (up to
+    ``max_batch_size``) are grouped into a single Message Batches request.
+    The batch is polled every ``poll_interval`` seconds until it ends, and
+    each result is handed back to the caller waiting on it.
+    """
+
+    def __init__(
+        self,
+        transport: LLMTransport,
+        max_batch_size: int = 100,
+        max_wait: float = 5.0,
+        poll_interval: float = 30.0
+    ):
+        self.transport = transport
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._ids = itertools.count()
+        self.stats: Dict[str, int] = {"batches": 0, "requests": 0, "errors": 0}
+
+    async def submit(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        max_tokens: int = 2000,
+        system: Optional[str] = None
+    ) -> str:
+        """Queue a single-turn prompt for the next batch and return its text."""
+        params = self.transport.build_params(prompt, model, max_tokens, system)
+        cache = self.transport.cache
+        cache_key = None
+        if cache is not None:
+            cache_key = self.transport.cache_key(params)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((f"request-{next(self._ids)}", params, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch)
+
+        text = await future
+        if cache_key is not None:
+            await cache.put(cache_key, text)
+        return text
+
+    def _dispatch(self):
+        """Send everything queued so far as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        requests, self._pending = self._pending, []
+        if not requests:
+            return
+        task = asyncio.ensure_future(self._run_batch(requests))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, requests: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        futures = {custom_id: future for custom_id, _, future in requests}
+        batches = self.transport.client.messages.batches
+        try:
+            # Batches are billed and rate-limited apart from interactive calls,
+            # so creating one costs a request but none of the token budget
+            batch = await self.transport.request(
+                batches.create,
+                requests=[
+                    {"custom_id": custom_id, "params": params}
+                    for custom_id, params, _ in requests
+                ]
+            )
+            self.stats["batches"] += 1
+            self.stats["requests"] += len(requests)
+            logging.info(f"Submitted message batch {batch.id} with {len(requests)} requests")
+
+            while batch.processing_status != "ended":
+                await asyncio.sleep(self.poll_interval)
+                batch = await self.transport.request(batches.retrieve, message_batch_id=batch.id)
+
+            results = await self.transport.request(batches.results, message_batch_id=batch.id)
+            if hasattr(results, "__aiter__"):
+                async for item in results:
+                    self._resolve(futures, item)
+            else:
+                # Synchronous clients read the results stream with blocking I/O
+                loop = asyncio.get_running_loop()
+                for item in await loop.run_in_executor(None, list, results):
+                    self._resolve(futures, item)
+        except Exception as e:
+            logging.error(f"Message batch failed: {str(e)}")
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for custom_id, future in futures.items():
+                if not future.done():
+                    future.set_exception(BatchRequestError(f"No result for {custom_id}"))
+
+    def _resolve(self, futures: Dict[str, asyncio.Future], item: Any):
+        future = futures.get(item.custom_id)
+        if future is None or future.done():
+            return
+        if item.result.type == "succeeded":
+            self.transport.record_usage(item.result.message)
+            future.set_result(response_text(item.result.message))
+        else:
+            self.stats["errors"] += 1
+            error = getattr(item.result, "error", None)
+            future.set_exception(BatchRequestError(
+                f"Batch request {item.custom_id} {item.result.type}: {error}"
+            ))
+
+    async def flush(self):
+        """Send any queued prompts now and wait for in-flight batches."""
+        self._dispatch()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
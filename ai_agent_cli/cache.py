@@ -0,0 +1,181 @@
+"""Content-addressed cache for model responses."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """Two-tier cache for model responses keyed on a hash of the request.
+
+    Hits are served from an in-memory LRU first, then from an on-disk tier.
+    Entries in both tiers expire ``ttl`` seconds after they were written.
+    The disk tier evicts its oldest entries once it grows beyond
+    ``max_disk_bytes``.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_entries: int = 256,
+        ttl: float = 3600,
+        max_disk_bytes: int = 50 * 1024 * 1024
+    ):
+        self.cache_dir = cache_dir or Path.home() / ".ai_agent_cli" / "cache" / "responses"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        # key -> (write time, response)
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Disk writes run on executor threads; this guards the size accounting
+        self._disk_lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0
+        }
+
+    @staticmethod
+    def make_key(model: str, prompt: Any, max_tokens: int, **extra) -> str:
+        """Hash the parts of a request that determine its response."""
+        payload = json.dumps(
+            {"model": model, "prompt": prompt, "max_tokens": max_tokens, **extra},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, value: str, created: float):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return a cached response, or None on a miss."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            created, value = entry
+            if time.time() - created <= self.ttl:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["memory_hits"] += 1
+                return value
+            del self._memory[key]
+
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, self._read_disk, key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        created, value = entry
+        self._remember(key, value, created)
+        self.stats["hits"] += 1
+        self.stats["disk_hits"] += 1
+        return value
+
+    async def put(self, key: str, value: str):
+        """Store a response in both tiers."""
+        self._remember(key, value, time.time())
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_disk, key, value)
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        """Return ``(write time, response)`` for an unexpired disk entry."""
+        path = self._path(key)
+        try:
+            created = path.stat().st_mtime
+            if time.time() - created > self.ttl:
+                self._unlink(path)
+                return None
+            return created, json.loads(path.read_text())["value"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding unreadable cache entry {path.name}: {str(e)}")
+            self._unlink(path)
+            return None
+
+    def _write_disk(self, key: str, value: str):
+        path = self._path(key)
+        tmp_name = None
+        try:
+            path.parent.mkdir(exist_ok=True)
+            data = json.dumps({"created": time.time(), "value": value})
+            # A unique temp file per write, so concurrent writers of one key never share it
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            with self._disk_lock:
+                # Overwriting an entry only adds the difference in size
+                try:
+                    replaced = path.stat().st_size
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_name, path)
+                tmp_name = None
+                if self._disk_bytes is None:
+                    self._disk_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*/*.json"))
+                else:
+                    self._disk_bytes += len(data) - replaced
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._evict()
+        except Exception as e:
+            logging.error(f"Error writing response cache entry: {str(e)}")
+            if tmp_name is not None:
+                self._unlink(Path(tmp_name))
+
+    def _evict(self):
+        """Drop expired entries, then the oldest, until under 90% of the limit.
+
+        Called with ``_disk_lock`` held.
+        """
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                self._unlink(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._unlink(path)
+            total -= size
+        self._disk_bytes = total
+
+    def _unlink(self, path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Remove every cached response."""
+        self._memory.clear()
+        with self._disk_lock:
+            for path in self.cache_dir.glob("*/*.json"):
+                self._unlink(path)
+            self._disk_bytes = 0
@@ -59,6 +59,57 @@ class Config:
             "workspace_dir": str(Path.home() / "ai_agent_projects"),
             "max_concurrent_projects": 3,
             "multi_agent_mode": True,
+            "llm": {
+                "max_concurrency": 8,
+                "cache": {
+                    "enabled": True,
+                    "memory_entries": 256,
+                    "ttl_seconds": 3600,
+                    "max_disk_mb": 50
+                },
+                "batch": {
+                    "enabled": False,
+                    "max_batch_size": 100,
+                    "max_wait_seconds": 5,
+                    "poll_interval_seconds": 30
+                }
+            },
+            "context": {
+                "max_prompt_tokens": 4000,
+                "summarize": True,
+                "summary_cache_size": 128
+            },
+            "rate_limits": {
+                "anthropic": {
+                    "requests_per_minute": 50,
+                    "tokens_per_minute": 40000,
+                    "max_retries": 6
+                },
+                "github": {
+                    "requests_per_hour": 5000,
+                    "max_retries": 6
+                }
+            },
+            "github": {
+                "api_url": "https://api.github.com",
+                "graphql_url": "https://api.github.com/graphql",
+                "metadata_batch_size": 50,  # repositories per GraphQL query (max 100)
+                "page_cache": {
+                    "enabled": True,
+                    "max_age_seconds": 300,  # served without revalidation while younger
+                    "max_disk_mb": 100
+                }
+            },
+            "network": {
+                "mailbox_size": 100
+            },
+            "memory": {
+                "backend": "log",  # "log", "sqlite" or "json"
+                "compact_threshold": 4194304,  # 4MB
+                "fsync": False,
+                "flush_interval_ms": 250,  # 0 writes through on every store
+                "flush_max_writes": 100
+            },
             "project_types": ["library", "cli-tool", "web-app", "api"],
             "analysis_sources": {
                 "github": True,
@@ -67,18 +118,20 @@ class Config:
                 "research_papers": True
             },
             "agent_settings": {
-                "coordinator": {"active": True},
-                "architect": {"active": True},
-                "researcher": {"active": True},
-                "developer": {"active": True},
-                "reviewer": {"active": True},
-                "security": {"active": True}
+                # concurrency: messages an agent handles at the same time
+                "coordinator": {"active": True, "concurrency": 1},
+                "architect": {"active": True, "concurrency": 2},
+                "researcher": {"active": True, "concurrency": 1},
+                "developer": {"active": True, "concurrency": 3},
+                "reviewer": {"active": True, "concurrency": 3},
+                "security": {"active": True, "concurrency": 2}
             },
             "logging": {
                 "level": "INFO",
                 "file": str(self.config_dir / "ai_agent.log"),
                 "max_size": 10485760,  # 10MB
-                "backup_count": 5
+                "backup_count": 5,
+                "compress_backups": False  # gzip rotated log files
             },
             "security": {
                 "enable_code_signing": False,
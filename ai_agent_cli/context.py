@@ -0,0 +1,136 @@
+"""Token-budgeted assembly of prompt context."""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from .transport import LLMTransport
+
+# Below this many tokens a compacted section says too little to be worth sending
+MIN_SECTION_TOKENS = 32
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token estimate: roughly four characters per token."""
+    return (len(text) + 3) // 4
+
+
+def render(content: Any) -> str:
+    """Render section content as stable text."""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, sort_keys=True, default=str)
+
+
+@dataclass
+class Section:
+    """A named block of prompt context.
+
+    Sections with higher ``priority`` keep their full text first; the rest
+    are summarised or truncated to fit what is left of the budget.
+    """
+    name: str
+    content: Any
+    priority: int = 0
+
+
+class ContextBuilder:
+    """Fit prompt sections into a per-call token budget.
+
+    When a ``transport`` is given, sections that do not fit are summarised
+    by the model; otherwise they are truncated. Summaries are cached by a
+    hash of the section's content alone and cut down to the current
+    allowance when it shrinks, so unchanged state is not summarised again
+    on the next cycle even when the sections around it change size.
+    """
+
+    def __init__(
+        self,
+        budget: int = 4000,
+        transport: Optional[LLMTransport] = None,
+        summary_model: Optional[str] = None,
+        cache_size: int = 128
+    ):
+        self.budget = budget
+        self.transport = transport
+        self.summary_model = summary_model
+        self.cache_size = cache_size
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+
+    async def build(self, sections: List[Section], budget: Optional[int] = None) -> str:
+        """Render ``sections`` in order, compacting low-priority ones to fit.
+
+        ``budget`` should cover everything the sections add to one model
+        call; callers that split context between the prompt and the system
+        block pass each part its share.
+        """
+        budget = max(0, self.budget if budget is None else budget)
+        texts = [render(section.content) for section in sections]
+        sizes = [approx_tokens(f"{section.name}:\n{text}\n\n") for section, text in zip(sections, texts)]
+        if sum(sizes) <= budget:
+            return self._join(sections, texts)
+
+        remaining = budget
+        fitted = list(texts)
+        for index in sorted(range(len(sections)), key=lambda i: -sections[i].priority):
+            if sizes[index] <= remaining:
+                remaining -= sizes[index]
+                continue
+            allowance = remaining - approx_tokens(f"{sections[index].name}:\n\n\n")
+            if allowance < MIN_SECTION_TOKENS:
+                fitted[index] = None
+                continue
+            fitted[index] = await self._compact(sections[index].name, texts[index], allowance)
+            remaining -= approx_tokens(f"{sections[index].name}:\n{fitted[index]}\n\n")
+        return self._join(sections, fitted)
+
+    def _join(self, sections: List[Section], texts: List[Optional[str]]) -> str:
+        return "\n\n".join(
+            f"{section.name}:\n{text}"
+            for section, text in zip(sections, texts)
+            if text is not None
+        )
+
+    async def _compact(self, name: str, text: str, allowance: int) -> str:
+        key = hashlib.sha256(f"{name}:{text}".encode("utf-8")).hexdigest()
+        summary = self._summaries.get(key)
+        if summary is not None:
+            self._summaries.move_to_end(key)
+            return self._truncate(summary, allowance)
+
+        if self.transport is None:
+            return self._truncate(text, allowance)
+        summary = None
+        try:
+            summary = await self._summarize(name, text, allowance)
+        except Exception as e:
+            logging.warning(f"Falling back to truncating {name}: {str(e)}")
+        if not summary:
+            return self._truncate(text, allowance)
+
+        # Only model summaries are cached; truncation is cheap to redo
+        self._summaries[key] = summary
+        while len(self._summaries) > self.cache_size:
+            self._summaries.popitem(last=False)
+        return self._truncate(summary, allowance)
+
+    async def _summarize(self, name: str, text: str, allowance: int) -> str:
+        prompt = f"""Summarize the following {name} in at most {allowance * 3 // 4} words.
+Keep names, numbers and anything still actionable; drop detail that is only historical.
+
+{text}"""
+        params = {"max_tokens": allowance}
+        if self.summary_model:
+            params["model"] = self.summary_model
+        return (await self.transport.complete(prompt, **params)).strip()
+
+    @staticmethod
+    def _truncate(text: str, allowance: int) -> str:
+        limit = allowance * 4
+        if len(text) <= limit:
+            return text
+        marker = f" ... [truncated {approx_tokens(text[limit:])} tokens]"
+        return text[:max(0, limit - len(marker))] + marker
@@ -0,0 +1,293 @@
+"""Asynchronous GitHub API client with caching and quota tracking."""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from .http_cache import fetch_page
+from .utils import create_http_session, extract_repo_name
+
+API_URL = "https://api.github.com"
+
+# Larger batches risk GitHub's GraphQL node and timeout limits
+MAX_METADATA_BATCH = 100
+
+REPO_PATTERN = re.compile(r"github\.com/([\w.-]+)/([\w.-]+?)(?:\.git)?/?$")
+
+REPOSITORY_FIELDS = """
+fragment RepositoryFields on Repository {
+  stargazerCount
+  forkCount
+  pushedAt
+  languages(first: 10, orderBy: {field: SIZE, direction: DESC}) {
+    totalSize
+    edges { size node { name } }
+  }
+  repositoryTopics(first: 20) { nodes { topic { name } } }
+  defaultBranchRef {
+    target {
+      ... on Commit {
+        history(first: 10) {
+          totalCount
+          nodes { messageHeadline committedDate author { name user { login } } }
+        }
+      }
+    }
+  }
+  openIssues: issues(states: OPEN) { totalCount }
+  closedIssues: issues(states: CLOSED) { totalCount }
+  recentIssues: issues(first: 5, orderBy: {field: CREATED_AT, direction: DESC}) {
+    nodes { title state comments { totalCount } }
+  }
+}
+"""
+
+
+def parse_repo_url(url: str) -> Optional[Tuple[str, str]]:
+    """Return ``(owner, name)`` for a GitHub repository URL, if it is one."""
+    match = REPO_PATTERN.search(url.strip())
+    return (match.group(1), match.group(2)) if match else None
+
+
+def repository_analysis(url: str, node: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a GraphQL repository node like ``utils.analyze_repository`` output."""
+    languages = node.get("languages") or {}
+    total_size = languages.get("totalSize") or 0
+    history = ((node.get("defaultBranchRef") or {}).get("target") or {}).get("history") or {}
+    commits = []
+    for commit in history.get("nodes") or []:
+        author = commit.get("author") or {}
+        commits.append({
+            "message": commit.get("messageHeadline", ""),
+            "author": (author.get("user") or {}).get("login") or author.get("name") or "",
+            "timestamp": commit.get("committedDate", "")
+        })
+
+    return {
+        "url": url,
+        "name": extract_repo_name(url),
+        "stars": node.get("stargazerCount", 0),
+        "forks": node.get("forkCount", 0),
+        "languages": {
+            edge["node"]["name"]: round(edge["size"] * 100 / total_size, 1)
+            for edge in languages.get("edges") or []
+            if total_size
+        },
+        "topics": [
+            topic["topic"]["name"]
+            for topic in (node.get("repositoryTopics") or {}).get("nodes") or []
+        ],
+        "last_updated": node.get("pushedAt") or "",
+        "activity": {
+            "commits": {
+                "recent_commits": commits,
+                "commit_count": history.get("totalCount", len(commits))
+            },
+            "issues": {
+                "open_issues": (node.get("openIssues") or {}).get("totalCount", 0),
+                "closed_issues": (node.get("closedIssues") or {}).get("totalCount", 0),
+                "recent_issues": [
+                    {
+                        "title": issue.get("title", ""),
+                        "state": issue.get("state", "").lower(),
+                        "comments": (issue.get("comments") or {}).get("totalCount", 0)
+                    }
+                    for issue in (node.get("recentIssues") or {}).get("nodes") or []
+                ]
+            },
+            "analysis_timestamp": datetime.now().isoformat()
+        }
+    }
+
+
+class GitHubClient:
+    """Async facade over the GitHub REST API.
+
+    Requests share one pooled keep-alive session and the ``github`` rate
+    limiter. Responses are revalidated with their ETag, so an unchanged
+    resource costs a 304 that GitHub does not count against the quota, and
+    slow-changing lookups such as the authenticated user are memoized for
+    ``cache_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        api_url: str = API_URL,
+        cache_ttl: float = 300,
+        max_cached_responses: int = 256,
+        graphql_url: Optional[str] = None,
+        metadata_batch_size: int = 50
+    ):
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.graphql_url = graphql_url or f"{self.api_url}/graphql"
+        self.metadata_batch_size = max(1, min(metadata_batch_size, MAX_METADATA_BATCH))
+        self.cache_ttl = cache_ttl
+        self.max_cached_responses = max_cached_responses
+        self.rate_limit: Dict[str, Optional[int]] = {"limit": None, "remaining": None, "reset": None}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._responses: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._memo: Dict[str, Tuple[float, asyncio.Future]] = {}
+        self._login: Optional[str] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = create_http_session()
+        return self._session
+
+    async def get_json(self, path: str) -> Any:
+        """GET an API path and return its decoded JSON body."""
+        url = path if path.startswith("http") else f"{self.api_url}/{path.lstrip('/')}"
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        cached = self._responses.get(url)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        status, body, response_headers = await fetch_page(self._get_session(), url, headers)
+        self._record_quota(response_headers)
+        if status == 304 and cached:
+            self._responses.move_to_end(url)
+            return cached[1]
+        if status != 200:
+            raise ValueError(f"GitHub API request {url} failed: {status}")
+
+        data = json.loads(body)
+        etag = response_headers.get("ETag")
+        if etag:
+            self._responses[url] = (etag, data)
+            self._responses.move_to_end(url)
+            while len(self._responses) > self.max_cached_responses:
+                self._responses.popitem(last=False)
+        return data
+
+    async def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run a GraphQL query and return its ``data``.
+
+        Partial errors (such as one missing repository) are logged and
+        leave ``None`` in their place; the query only raises when GitHub
+        returns no data at all.
+        """
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        status, body, response_headers = await fetch_page(
+            self._get_session(),
+            self.graphql_url,
+            headers,
+            method="POST",
+            json_body={"query": query, "variables": variables or {}}
+        )
+        self._record_quota(response_headers)
+        if status != 200:
+            raise ValueError(f"GitHub GraphQL request failed: {status}")
+
+        payload = json.loads(body)
+        errors = payload.get("errors") or []
+        if payload.get("data") is None:
+            messages = "; ".join(error.get("message", "") for error in errors)
+            raise ValueError(f"GitHub GraphQL query failed: {messages}")
+        for error in errors:
+            logging.debug(f"GitHub GraphQL error at {error.get('path')}: {error.get('message')}")
+        return payload["data"]
+
+    async def repository_metadata(self, repo_urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch analyses for many repositories with one query per batch.
+
+        Returns a mapping of URL to the same dict ``utils.analyze_repository``
+        builds. URLs that are not repositories, do not resolve, or belong to
+        a batch that failed are left out, so callers can scrape them instead.
+        """
+        repos = {}
+        for url in repo_urls:
+            parsed = parse_repo_url(url)
+            if parsed:
+                repos[url] = parsed
+        urls = list(repos)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        # Batches run one after another; GitHub penalises concurrent GraphQL queries
+        for start in range(0, len(urls), self.metadata_batch_size):
+            batch = urls[start:start + self.metadata_batch_size]
+            declarations, fields, variables = [], [], {}
+            for index, url in enumerate(batch):
+                owner, name = repos[url]
+                variables[f"owner{index}"], variables[f"name{index}"] = owner, name
+                declarations.append(f"$owner{index}: String!, $name{index}: String!")
+                fields.append(
+                    f"  repo{index}: repository(owner: $owner{index}, name: $name{index}) "
+                    "{ ...RepositoryFields }"
+                )
+            query = "query({}) {{\n{}\n}}\n{}".format(
+                ", ".join(declarations), "\n".join(fields), REPOSITORY_FIELDS
+            )
+            try:
+                data = await self.graphql(query, variables)
+            except Exception as e:
+                logging.warning(f"GraphQL metadata batch of {len(batch)} repositories failed: {str(e)}")
+                continue
+            for index, url in enumerate(batch):
+                node = data.get(f"repo{index}")
+                if node:
+                    results[url] = repository_analysis(url, node)
+        return results
+
+    def _record_quota(self, headers):
+        # GraphQL has its own point quota; only the REST core quota is tracked
+        if headers.get("X-RateLimit-Resource", "core") != "core":
+            return
+        for field, header in (
+            ("limit", "X-RateLimit-Limit"),
+            ("remaining", "X-RateLimit-Remaining"),
+            ("reset", "X-RateLimit-Reset")
+        ):
+            if headers.get(header) is not None:
+                self.rate_limit[field] = int(headers[header])
+        limit, remaining = self.rate_limit["limit"], self.rate_limit["remaining"]
+        if limit and remaining is not None and remaining < limit * 0.1:
+            logging.warning(f"GitHub API quota low: {remaining}/{limit} requests left")
+
+    async def _memoized(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        # Concurrent callers share one in-flight request; failures are not cached
+        entry = self._memo.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.cache_ttl:
+            entry = (time.monotonic(), asyncio.ensure_future(fetch()))
+            self._memo[key] = entry
+        try:
+            return await asyncio.shield(entry[1])
+        except Exception:
+            if self._memo.get(key) is entry:
+                del self._memo[key]
+            raise
+
+    async def get_user(self) -> Dict[str, Any]:
+        """Return the authenticated user's profile."""
+        return await self._memoized("user", lambda: self.get_json("/user"))
+
+    async def login(self) -> str:
+        """Return the authenticated user's login, fetched once per client."""
+        if self._login is None:
+            self._login = (await self.get_user())["login"]
+        return self._login
+
+    async def verify(self):
+        """Check the token with one authenticated request, raising if it is rejected."""
+        await self.get_user()
+
+    async def quota(self) -> Dict[str, Optional[int]]:
+        """Refresh and return the core API quota; this call is not counted against it."""
+        core = (await self.get_json("/rate_limit"))["resources"]["core"]
+        self.rate_limit.update(limit=core["limit"], remaining=core["remaining"], reset=core["reset"])
+        return dict(self.rate_limit)
+
+    async def close(self):
+        """Close the HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
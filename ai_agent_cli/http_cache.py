@@ -0,0 +1,191 @@
+"""On-disk HTTP cache with conditional revalidation for scraped pages."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import aiohttp
+
+from .rate_limit import RateLimiter, RetryableError, get_limiter, parse_retry_after
+
+
+def _throttle_delay(status: int, headers: Mapping[str, str]) -> Optional[float]:
+    """Return a retry delay if a GitHub response signals throttling, else None."""
+    if status == 429 or (status == 403 and (
+        "Retry-After" in headers or headers.get("X-RateLimit-Remaining") == "0"
+    )):
+        delay = parse_retry_after(headers.get("Retry-After"))
+        if delay is None and headers.get("X-RateLimit-Reset"):
+            delay = max(0.0, float(headers["X-RateLimit-Reset"]) - time.time())
+        return delay if delay is not None else -1.0
+    if status in (502, 503, 504):
+        return -1.0
+    return None
+
+
+async def fetch_page(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    limiter: Optional[RateLimiter] = None,
+    method: str = "GET",
+    json_body: Any = None
+) -> Tuple[int, str, Mapping[str, str]]:
+    """Request a page through the shared ``github`` rate limiter.
+
+    Throttled responses are retried by the limiter; the final status, body
+    and headers are returned.
+    """
+    async def attempt():
+        async with session.request(method, url, headers=headers or {}, json=json_body) as response:
+            delay = _throttle_delay(response.status, response.headers)
+            if delay is not None:
+                raise RetryableError(
+                    f"HTTP {response.status} from {url}",
+                    delay if delay >= 0 else None
+                )
+            body = await response.text() if response.status != 304 else ""
+            return response.status, body, response.headers
+
+    return await (limiter or get_limiter("github")).call(attempt)
+
+
+class HTTPCache:
+    """Cache page bodies on disk alongside their validators.
+
+    Entries younger than ``max_age`` seconds are served without touching the
+    network. Older entries are revalidated with ``If-None-Match`` /
+    ``If-Modified-Since`` so an unchanged page costs a 304 instead of a full
+    download. The least recently used bodies are evicted once the cache
+    exceeds ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_age: float = 300,
+        max_bytes: int = 100 * 1024 * 1024
+    ):
+        self.cache_dir = cache_dir or Path.home() / ".ai_agent_cli" / "http_cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / "index.json"
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.index: Dict[str, Dict[str, Any]] = self._load_index()
+        self.stats: Dict[str, int] = {"fresh": 0, "revalidated": 0, "fetched": 0}
+        self._index_lock = threading.Lock()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if self.index_file.exists():
+                return json.loads(self.index_file.read_text())
+        except Exception as e:
+            logging.error(f"Error loading HTTP cache index: {str(e)}")
+        return {}
+
+    def _save_index(self, index: Dict[str, Dict[str, Any]]):
+        with self._index_lock:
+            tmp_file = self.index_file.with_suffix(".tmp")
+            tmp_file.write_text(json.dumps(index))
+            os.replace(tmp_file, self.index_file)
+
+    def _body_path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.html"
+
+    def _read_body(self, url: str) -> Optional[str]:
+        try:
+            return self._body_path(url).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def _write_body(self, url: str, body: str):
+        path = self._body_path(url)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(body, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        require_ok: bool = True
+    ) -> str:
+        """Return the body of ``url``, from cache when it is still valid."""
+        entry = self.index.get(url)
+        now = time.time()
+
+        if entry and now - entry["fetched"] < self.max_age:
+            body = await self._run(self._read_body, url)
+            if body is not None:
+                entry["accessed"] = now
+                self.stats["fresh"] += 1
+                return body
+            entry = None
+
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        status, body, response_headers = await fetch_page(session, url, headers)
+        if status == 304 and entry:
+            body = await self._run(self._read_body, url)
+            if body is not None:
+                entry["fetched"] = entry["accessed"] = now
+                self.stats["revalidated"] += 1
+                await self._run(self._save_index, dict(self.index))
+                return body
+            # Body went missing; retry without validators
+            self.index.pop(url, None)
+            return await self.fetch(session, url, require_ok)
+
+        if require_ok and status != 200:
+            raise ValueError(f"Failed to fetch {url}: {status}")
+        self.stats["fetched"] += 1
+        if status == 200:
+            await self._store(url, body, response_headers)
+        return body
+
+    async def _store(self, url: str, body: str, headers):
+        now = time.time()
+        try:
+            await self._run(self._write_body, url, body)
+        except Exception as e:
+            logging.error(f"Error writing HTTP cache entry for {url}: {str(e)}")
+            return
+        self.index[url] = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched": now,
+            "accessed": now,
+            "size": len(body.encode("utf-8"))
+        }
+        self._evict()
+        await self._run(self._save_index, dict(self.index))
+
+    def _evict(self):
+        """Drop least recently used entries until under the size limit."""
+        total = sum(entry["size"] for entry in self.index.values())
+        if total <= self.max_bytes:
+            return
+        for url, entry in sorted(self.index.items(), key=lambda item: item[1]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            try:
+                self._body_path(url).unlink()
+            except FileNotFoundError:
+                pass
+            del self.index[url]
+            total -= entry["size"]
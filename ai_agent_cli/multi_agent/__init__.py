@@ -1,28 +1,13 @@
 """Multi-agent system package."""
 
-from .core import AgentNetwork, AgentRole, Message, SpecializedAgent
-from .agents import (
-    CoordinatorAgent,
-    ArchitectAgent,
-    ResearcherAgent,
-    DeveloperAgent,
-    ReviewerAgent,
-    SecurityAgent
-)
-from rich.console import Console
-import aiohttp
-import asyncio
-import json
-from datetime import datetime
-from typing import Dict, Any, List, Optional
-
-# Initialize shared console
-console = Console()
+import importlib
+from typing import TYPE_CHECKING
 
 __all__ = [
     'AgentNetwork',
     'AgentRole',
     'Message',
+    'MessageRouter',
     'SpecializedAgent',
     'CoordinatorAgent',
     'ArchitectAgent',
@@ -31,4 +16,46 @@ __all__ = [
     'ReviewerAgent',
     'SecurityAgent',
     'console'
-]
\ No newline at end of file
+]
+
+# Public names and the submodules that define them; each is imported on
+# first access (PEP 562) so that importing the package stays cheap
+_LAZY_ATTRIBUTES = {
+    'AgentNetwork': '.core',
+    'AgentRole': '.core',
+    'Message': '.core',
+    'MessageRouter': '.core',
+    'SpecializedAgent': '.core',
+    'CoordinatorAgent': '.agents',
+    'ArchitectAgent': '.agents',
+    'ResearcherAgent': '.agents',
+    'DeveloperAgent': '.agents',
+    'ReviewerAgent': '.agents',
+    'SecurityAgent': '.agents',
+    # Shared console
+    'console': '.core',
+}
+
+if TYPE_CHECKING:
+    from .core import AgentNetwork, AgentRole, Message, MessageRouter, SpecializedAgent, console
+    from .agents import (
+        CoordinatorAgent,
+        ArchitectAgent,
+        ResearcherAgent,
+        DeveloperAgent,
+        ReviewerAgent,
+        SecurityAgent
+    )
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
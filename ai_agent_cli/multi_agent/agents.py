@@ -1,26 +1,259 @@
 """Specialized agent implementations."""
 
 import asyncio
-from typing import Dict, Any, List
-import anthropic
-from .core import SpecializedAgent, AgentRole, Message
+import itertools
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Dict, Any, List, Optional, Set, Tuple
+from .core import SpecializedAgent, AgentRole, Message, MessageRouter
+from ..context import ContextBuilder, Section, approx_tokens
+from ..transport import LLMTransport, iter_lines
+from ..utils import analyze_repositories, create_http_session, fetch_trending_projects
 from rich.console import Console
 
 console = Console()
 
 
 class CoordinatorAgent(SpecializedAgent):
-    def __init__(self, client: anthropic.Anthropic, message_queue: asyncio.Queue, shared_memory):
-        super().__init__(client, message_queue, shared_memory, AgentRole.COORDINATOR)
+    # Bounds (seconds) for the idle re-planning interval
+    MIN_IDLE_BACKOFF = 30
+    MAX_IDLE_BACKOFF = 600
+    # Events arriving within this many seconds of a planning round share the next one
+    MIN_REPLAN_INTERVAL = 15
+    # Shared-memory keys written by other agents that feed the coordinator's prompts
+    WATCHED_KEYS = ("latest_trends",)
+    # A research request older than this is assumed lost and may be re-sent
+    RESEARCH_TIMEOUT = 600
+    # Minimum seconds between completed research and the next request
+    RESEARCH_INTERVAL = 900
+    # Finished and failed projects kept for the state summary
+    MAX_FINISHED_PROJECTS = 20
+    # Share of each call's context budget given to research in the system block
+    RESEARCH_BUDGET_SHARE = 0.5
+    # A pipeline stage without a reply for this long fails its project
+    STAGE_TIMEOUT = 1800
+    # Stages whose agents use message batches when batching is enabled; a
+    # batch may take up to 24 hours to end
+    BATCHED_STAGES = ("development", "security")
+    BATCH_STAGE_TIMEOUT = 24 * 3600 + STAGE_TIMEOUT
+    # (stage, role, task) for each project after research suggested it; the
+    # development stage is answered by the reviewer the developer forwards to
+    PIPELINE = (
+        ("architecture", AgentRole.ARCHITECT, "design_system"),
+        ("development", AgentRole.DEVELOPER, "implement_feature"),
+        ("security", AgentRole.SECURITY, "security_audit"),
+    )
+
+    def __init__(
+        self,
+        transport: LLMTransport,
+        router: MessageRouter,
+        shared_memory,
+        context_builder: Optional[ContextBuilder] = None,
+        max_concurrent_projects: int = 3
+    ):
+        super().__init__(transport, router, shared_memory, AgentRole.COORDINATOR)
+        self.context_builder = context_builder or ContextBuilder()
+        self.max_concurrent_projects = max(1, max_concurrent_projects)
         self.active_projects = {}
+        self.finished_projects: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._project_ids = itertools.count(1)
+        self._project_queue: Optional[asyncio.Queue] = None
+        self._replies: Dict[Tuple[str, str], asyncio.Future] = {}
         self.agent_status = {role: "idle" for role in AgentRole}
+        self.idle_backoff = self.MIN_IDLE_BACKOFF
+        self.research_requested_at = None
+        self.research_completed_at = None
+        self._wakeup = None
+        self._planned_at = 0.0
+        self.shared_memory.add_listener(self._on_memory_change)
+
+    @property
+    def wakeup(self) -> asyncio.Event:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    def notify(self):
+        """Ask the coordination loop to re-plan now"""
+        self.wakeup.set()
+
+    def _on_memory_change(self, key: str, entry: Optional[Dict[str, Any]]):
+        # Ignore the coordinator's own project records and unrelated keys
+        if key in self.WATCHED_KEYS:
+            self.notify()
+
+    @property
+    def project_queue(self) -> asyncio.Queue:
+        if self._project_queue is None:
+            self._project_queue = asyncio.Queue()
+        return self._project_queue
+
+    async def handle_message(self, message: Message):
+        """Record completion reports from other agents and trigger re-planning"""
+        key = (message.content.get("project_id"), message.content.get("stage"))
+        future = self._replies.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(message.content)
+        if message.content.get("status") == "completed":
+            self.agent_status[message.from_role] = "idle"
+            if message.from_role == AgentRole.RESEARCHER:
+                self.research_requested_at = None
+                self.research_completed_at = time.monotonic()
+                trends = message.content.get("trends") or {}
+                for suggestion in trends.get("project_suggestions", []):
+                    self.submit_project(suggestion)
+        self.notify()
+
+    @staticmethod
+    def _project_key(name: Any) -> str:
+        return str(name).strip().lower()
+
+    def known_projects(self) -> Set[str]:
+        """Normalised names of queued, running, finished and stored projects"""
+        names = {
+            self._project_key(project["name"])
+            for projects in (self.active_projects, self.finished_projects)
+            for project in projects.values()
+        }
+        for key, entry in list(self.shared_memory.memory.items()):
+            value = entry.get("value")
+            if key.startswith("project:") and isinstance(value, dict) and "name" in value:
+                names.add(self._project_key(value["name"]))
+        return names
+
+    def submit_project(self, suggestion: Dict[str, Any]) -> Optional[str]:
+        """Queue a suggested project for the pipeline pool
+
+        Returns None without queueing when a project of the same name is
+        already known.
+        """
+        name = suggestion.get("name")
+        if name and self._project_key(name) in self.known_projects():
+            console.print(f"[dim]Skipping duplicate project suggestion: {name}[/dim]")
+            return None
+        project_id = f"project-{next(self._project_ids)}"
+        self.active_projects[project_id] = {
+            "name": suggestion.get("name", project_id),
+            "status": "queued",
+            "suggestion": suggestion
+        }
+        self.project_queue.put_nowait(project_id)
+        return project_id
+
+    @property
+    def projects_in_progress(self) -> bool:
+        return bool(self.active_projects)
+
+    def _archive_project(self, project_id: str):
+        """Move a completed or failed project out of the active set"""
+        project = self.active_projects.pop(project_id, None)
+        if project is None:
+            return
+        self.finished_projects[project_id] = project
+        while len(self.finished_projects) > self.MAX_FINISHED_PROJECTS:
+            self.finished_projects.popitem(last=False)
+
+    async def run_projects(self):
+        """Run project pipelines, at most ``max_concurrent_projects`` at a time"""
+        async def worker():
+            while self.active:
+                project_id = await self.project_queue.get()
+                try:
+                    await self.run_pipeline(project_id)
+                except Exception as e:
+                    self.active_projects[project_id].update(status="failed", error=str(e))
+                    console.print(f"[red]Error in project {project_id}: {str(e)}[/red]")
+                finally:
+                    self._archive_project(project_id)
+                    self.project_queue.task_done()
+                    self.notify()
+
+        await asyncio.gather(*(worker() for _ in range(self.max_concurrent_projects)))
+
+    async def run_pipeline(self, project_id: str):
+        """Take one project through architecture, development/review and security"""
+        project = self.active_projects[project_id]
+        context = {"project": project["suggestion"]}
+        for stage, role, task in self.PIPELINE:
+            project["status"] = stage
+            result = await self.request_stage(project_id, stage, role, task, context)
+            if result.get("status") == "failed":
+                project.update(status="failed", error=result.get("error"))
+                console.print(f"[red]Project {project['name']} failed at {stage}: {result.get('error')}[/red]")
+                return
+            context = {
+                **context,
+                **{key: value for key, value in result.items()
+                   if key not in ("status",) + self.CORRELATION_KEYS}
+            }
+        project["status"] = "completed"
+        await self.shared_memory.store(f"project:{project_id}", {"name": project["name"], **context})
+        console.print(f"[green]Project {project['name']} completed[/green]")
+
+    async def request_stage(
+        self,
+        project_id: str,
+        stage: str,
+        role: AgentRole,
+        task: str,
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Send one pipeline stage and wait for the reply correlated with it"""
+        future = asyncio.get_running_loop().create_future()
+        self._replies[(project_id, stage)] = future
+        try:
+            await self.send_message(
+                role,
+                {"task": task, "context": context, "project_id": project_id, "stage": stage}
+            )
+            timeout = self.stage_timeout(stage)
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            return {"status": "failed", "error": f"no reply to {stage} within {timeout}s"}
+        finally:
+            self._replies.pop((project_id, stage), None)
+
+    def stage_timeout(self, stage: str) -> float:
+        """Seconds to wait for a stage's reply, allowing for message batches"""
+        if self.transport.batcher is not None and stage in self.BATCHED_STAGES:
+            return self.BATCH_STAGE_TIMEOUT
+        return self.STAGE_TIMEOUT
+
+    @property
+    def research_in_flight(self) -> bool:
+        if self.research_requested_at is None:
+            return False
+        return time.monotonic() - self.research_requested_at < self.RESEARCH_TIMEOUT
+
+    @property
+    def research_due(self) -> bool:
+        """Whether new research may be requested now"""
+        if self.research_in_flight:
+            return False
+        if self.research_completed_at is None:
+            return True
+        return time.monotonic() - self.research_completed_at >= self.RESEARCH_INTERVAL
 
     async def coordinate(self):
-        """Main coordination loop"""
+        """Main coordination loop, driven by agent reports and memory changes"""
+        projects = asyncio.ensure_future(self.run_projects())
+        try:
+            await self._coordinate()
+        finally:
+            projects.cancel()
+
+    async def _coordinate(self):
         while self.active:
-            # First, if no projects, request research
-            if not self.active_projects:
+            self._planned_at = time.monotonic()
+            # First, if no projects, request research unless a request is
+            # outstanding or the last one finished too recently
+            if not self.projects_in_progress and self.research_due:
                 console.print("[yellow]No active projects. Requesting trend analysis...[/yellow]")
+                self.research_requested_at = time.monotonic()
+                self.agent_status[AgentRole.RESEARCHER] = "busy"
                 await self.send_message(
                     AgentRole.RESEARCHER,
                     {
@@ -36,24 +269,86 @@ class CoordinatorAgent(SpecializedAgent):
             # Analyze current state
             state = await self.analyze_system_state()
             
-            # Make strategic decisions
-            decisions = await self.make_strategic_decisions(state)
-            
-            # Delegate tasks
-            for decision in decisions:
+            # Make strategic decisions, delegating each one as soon as it is parsed
+            async for decision in self.stream_strategic_decisions(state):
                 await self.delegate_task(decision)
             
-            await asyncio.sleep(30)  # Check every 30 seconds
+            await self.wait_for_event()
+
+    async def wait_for_event(self):
+        """Sleep until something changes, backing off while the system is idle
+
+        A burst of events is coalesced: planning rounds start at most once
+        per ``MIN_REPLAN_INTERVAL`` seconds, and every event that arrives
+        before then is covered by the same round.
+        """
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout=self.idle_backoff)
+            self.idle_backoff = self.MIN_IDLE_BACKOFF
+        except asyncio.TimeoutError:
+            self.idle_backoff = min(self.idle_backoff * 2, self.MAX_IDLE_BACKOFF)
+        delay = self._planned_at + self.MIN_REPLAN_INTERVAL - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.wakeup.clear()
+
+    async def delegate_task(self, decision: Dict[str, Any]):
+        """Route a parsed decision to the agent responsible for it"""
+        role = decision.get('agent_role')
+        if role is None or 'task' not in decision:
+            console.print(f"[yellow]Skipping unassigned decision: {decision}[/yellow]")
+            return
+        self.agent_status[role] = "busy"
+        await self.send_message(
+            role,
+            {
+                "task": decision['task'],
+                "context": decision.get('context', {})
+            },
+            priority=decision.get('priority', 1)
+        )
+
+    async def research_context(self, budget: Optional[int] = None) -> str:
+        """Latest research within ``budget``, stable enough for the prompt cache"""
+        latest_trends = await self.shared_memory.retrieve("latest_trends")
+        if not latest_trends:
+            return "Latest Research: None"
+        research = await self.context_builder.build([
+            Section("Researched At", latest_trends.get("timestamp", "unknown"), priority=3),
+            Section("Analysis", latest_trends.get("analysis", ""), priority=2),
+            Section("Trending Projects", latest_trends.get("trends", []), priority=1)
+        ], budget)
+        return f"Latest Research:\n{research}"
+
+    def state_sections(self) -> List[Section]:
+        """Agent and project state, finished projects compacted first"""
+        return [
+            Section("Agent Status", {role.value: status for role, status in self.agent_status.items()}, priority=3),
+            Section("Active Projects", self.active_projects or "None", priority=2),
+            Section("Finished Projects", dict(self.finished_projects) or "None", priority=0)
+        ]
+
+    async def fit_call(self, template: str, sections: List[Section]) -> Tuple[str, str]:
+        """Build the prompt and system context of one model call within one budget
+
+        Returns ``template`` with ``{context}`` filled from ``sections``, and
+        the research context for the system block. Research is fitted first
+        into a fixed share of the budget, so the cached system block does not
+        change when the state does; the prompt sections get what is left.
+        """
+        budget = (
+            self.context_builder.budget
+            - approx_tokens(template)
+            - approx_tokens(self.system_prompt())
+        )
+        research = await self.research_context(int(budget * self.RESEARCH_BUDGET_SHARE))
+        context = await self.context_builder.build(sections, budget - approx_tokens(research))
+        return template.replace("{context}", context), research
 
     async def analyze_system_state(self) -> Dict[str, Any]:
         """Analyze current state of all agents and projects"""
-        # Get latest research if available
-        latest_trends = await self.shared_memory.retrieve("latest_trends")
-        
-        prompt = f"""Given the current system state:
-        Active Projects: {self.active_projects}
-        Agent Status: {self.agent_status}
-        Latest Research: {latest_trends if latest_trends else 'None'}
+        prompt, research = await self.fit_call("""Given the current system state:
+        {context}
 
         Please analyze:
         1. Current system efficiency
@@ -61,9 +356,9 @@ class CoordinatorAgent(SpecializedAgent):
         3. Priority tasks
         4. Potential bottlenecks
         
-        Provide structured analysis for coordination."""
+        Provide structured analysis for coordination.""", self.state_sections())
         
-        analysis = await self.think(prompt)
+        analysis = await self.think(prompt, context=research)
         return self._parse_analysis(analysis)
 
     def _parse_analysis(self, response: str) -> Dict[str, Any]:
@@ -109,12 +404,12 @@ class CoordinatorAgent(SpecializedAgent):
 
     async def make_strategic_decisions(self, state: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Make strategic decisions based on system state"""
-        # Get latest research
-        latest_trends = await self.shared_memory.retrieve("latest_trends")
-        
-        prompt = f"""Based on:
-        System State: {state}
-        Latest Research: {latest_trends if latest_trends else 'None'}
+        return [decision async for decision in self.stream_strategic_decisions(state)]
+
+    async def stream_strategic_decisions(self, state: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield strategic decisions while the model is still writing them"""
+        prompt, research = await self.fit_call("""Based on:
+        {context}
         
         Determine:
         1. What tasks should be prioritized?
@@ -122,50 +417,77 @@ class CoordinatorAgent(SpecializedAgent):
         3. What agents should be assigned to what tasks?
         4. Are there any urgent interventions needed?
         
-        Provide specific, actionable decisions in a structured format."""
+        Provide specific, actionable decisions in a structured format.""", [Section("System State", state, priority=2)])
         
-        decisions = await self.think(prompt)
-        return self._parse_decisions(decisions)
+        parser = DecisionParser()
+        async for line in iter_lines(self.think_stream(prompt, research)):
+            decision = parser.feed(line)
+            if decision:
+                yield decision
+        decision = parser.finish()
+        if decision:
+            yield decision
 
     def _parse_decisions(self, response: str) -> List[Dict[str, Any]]:
         """Parse decisions into actionable tasks"""
+        parser = DecisionParser()
+        decisions = [
+            decision
+            for decision in map(parser.feed, response.split('\n'))
+            if decision
+        ]
+        decision = parser.finish()
+        if decision:
+            decisions.append(decision)
+        return decisions
+
+class DecisionParser:
+    """Incrementally parse Task/Agent/Priority/Context blocks line by line.
+
+    A decision is complete when the next ``Task:`` line starts or the input
+    ends, so callers can act on it before the full response has arrived.
+    """
+
+    def __init__(self):
+        self.current: Dict[str, Any] = {}
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """Consume one line; return a decision if this line completed one"""
+        completed = None
+        line = line.strip()
         try:
-            decisions = []
-            current_decision = {}
-            
-            for line in response.split('\n'):
-                line = line.strip()
-                if line.startswith('Task:'):
-                    if current_decision:
-                        decisions.append(current_decision)
-                    current_decision = {'task': line.split(':', 1)[1].strip()}
-                elif line.startswith('Agent:'):
-                    agent_name = line.split(':', 1)[1].strip().lower()
-                    current_decision['agent_role'] = getattr(AgentRole, agent_name, None)
-                elif line.startswith('Priority:'):
-                    try:
-                        current_decision['priority'] = int(line.split(':', 1)[1].strip())
-                    except ValueError:
-                        current_decision['priority'] = 1
-                elif line.startswith('Context:'):
-                    current_decision['context'] = line.split(':', 1)[1].strip()
-            
-            if current_decision:
-                decisions.append(current_decision)
-                
-            return decisions
+            if line.startswith('Task:'):
+                if self.current:
+                    completed = self.current
+                self.current = {'task': line.split(':', 1)[1].strip()}
+            elif line.startswith('Agent:'):
+                agent_name = line.split(':', 1)[1].strip().upper()
+                self.current['agent_role'] = getattr(AgentRole, agent_name, None)
+            elif line.startswith('Priority:'):
+                try:
+                    self.current['priority'] = int(line.split(':', 1)[1].strip())
+                except ValueError:
+                    self.current['priority'] = 1
+            elif line.startswith('Context:'):
+                self.current['context'] = line.split(':', 1)[1].strip()
         except Exception as e:
             console.print(f"[red]Error parsing decisions: {str(e)}[/red]")
-            return []
+        return completed
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Return the last pending decision, if any"""
+        completed, self.current = self.current, {}
+        return completed or None
 
 class ArchitectAgent(SpecializedAgent):
-    def __init__(self, client, message_queue, shared_memory):
-        super().__init__(client, message_queue, shared_memory, AgentRole.ARCHITECT)
+    def __init__(self, transport, router, shared_memory):
+        super().__init__(transport, router, shared_memory, AgentRole.ARCHITECT)
         
     async def handle_message(self, message: Message):
         if message.content["task"] == "design_system":
             architecture = await self.design_system(message.content["context"])
-            await self.send_message(
+            await self.reply(
+                message,
                 AgentRole.COORDINATOR,
                 {"architecture": architecture, "status": "completed"}
             )
@@ -194,14 +516,23 @@ class ArchitectAgent(SpecializedAgent):
         }
 
 class ResearcherAgent(SpecializedAgent):
-    def __init__(self, client, message_queue, shared_memory):
-        super().__init__(client, message_queue, shared_memory, AgentRole.RESEARCHER)
+    # Repository metadata fields added to each trending project
+    METADATA_FIELDS = ("stars", "forks", "languages", "topics", "last_updated")
+
+    def __init__(self, transport, router, shared_memory, github=None, http_cache=None):
+        super().__init__(transport, router, shared_memory, AgentRole.RESEARCHER)
+        # GitHubClient for batched GraphQL metadata; without one, trends are not enriched
+        self.github = github
+        # HTTPCache for scraped pages; without one, every page is downloaded
+        self.http_cache = http_cache
         self.github_trends = []
+        self.last_analysis: Optional[str] = None
         
     async def handle_message(self, message: Message):
         if message.content["task"] == "analyze_trends":
             trends = await self.analyze_trends(message.content["context"])
-            await self.send_message(
+            await self.reply(
+                message,
                 AgentRole.COORDINATOR,
                 {"trends": trends, "status": "completed"}
             )
@@ -209,9 +540,18 @@ class ResearcherAgent(SpecializedAgent):
     async def analyze_trends(self, context: Dict[str, Any]) -> Dict[str, Any]:
         try:
             # Analyze GitHub trends
-            async with aiohttp.ClientSession() as session:
-                trends = await fetch_trending_projects(session)
+            async with create_http_session() as session:
+                trends = await fetch_trending_projects(session, cache=self.http_cache)
+                if trends == self.github_trends and self.last_analysis is not None:
+                    # Nothing new is trending, so there is nothing new to suggest
+                    return {
+                        "trends": trends,
+                        "analysis": self.last_analysis,
+                        "project_suggestions": [],
+                        "unchanged": True
+                    }
                 self.github_trends = trends
+                trends = await self.add_metadata(session, trends)
 
                 prompt = f"""Given these trending GitHub projects:
                 {json.dumps(trends, indent=2)}
@@ -231,6 +571,7 @@ class ResearcherAgent(SpecializedAgent):
                 """
                 
                 analysis = await self.think(prompt)
+                self.last_analysis = analysis
                 
                 # Store findings in shared memory
                 await self.shared_memory.store(
@@ -251,6 +592,34 @@ class ResearcherAgent(SpecializedAgent):
             console.print(f"[red]Error in analyze_trends: {str(e)}[/red]")
             raise
 
+    async def add_metadata(self, session, trends: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return copies of ``trends`` with repository metadata
+
+        Metadata comes from batched GraphQL queries; only repositories those
+        miss are scraped.
+        """
+        if self.github is None or not trends:
+            return trends
+        analyses = await analyze_repositories(
+            [trend["url"] for trend in trends],
+            session,
+            cache=self.http_cache,
+            github=self.github
+        )
+        enriched = []
+        for trend, analysis in zip(trends, analyses):
+            if "error" in analysis:
+                enriched.append(trend)
+                continue
+            activity = analysis.get("activity", {})
+            enriched.append({
+                **trend,
+                **{field: analysis[field] for field in self.METADATA_FIELDS if field in analysis},
+                "commit_count": activity.get("commits", {}).get("commit_count"),
+                "open_issues": activity.get("issues", {}).get("open_issues")
+            })
+        return enriched
+
     def _parse_suggestions(self, analysis: str) -> List[Dict[str, Any]]:
         """Parse project suggestions from the analysis."""
         try:
@@ -282,13 +651,14 @@ class ResearcherAgent(SpecializedAgent):
             return []
         
 class DeveloperAgent(SpecializedAgent):
-    def __init__(self, client, message_queue, shared_memory):
-        super().__init__(client, message_queue, shared_memory, AgentRole.DEVELOPER)
+    def __init__(self, transport, router, shared_memory):
+        super().__init__(transport, router, shared_memory, AgentRole.DEVELOPER)
         
     async def handle_message(self, message: Message):
         if message.content["task"] == "implement_feature":
             code = await self.implement_feature(message.content["context"])
-            await self.send_message(
+            await self.reply(
+                message,
                 AgentRole.REVIEWER,
                 {"code": code, "context": message.content["context"]}
             )
@@ -309,8 +679,11 @@ class DeveloperAgent(SpecializedAgent):
         return code
 
 class ReviewerAgent(SpecializedAgent):
-    def __init__(self, client, message_queue, shared_memory):
-        super().__init__(client, message_queue, shared_memory, AgentRole.REVIEWER)
+    def __init__(self, transport, router, shared_memory):
+        super().__init__(transport, router, shared_memory, AgentRole.REVIEWER)
+
+    def uses_batch(self, message: Message) -> bool:
+        return bool(message.content.get("code"))
         
     async def handle_message(self, message: Message):
         if message.content.get("code"):
@@ -318,7 +691,8 @@ class ReviewerAgent(SpecializedAgent):
                 message.content["code"],
                 message.content["context"]
             )
-            await self.send_message(
+            await self.reply(
+                message,
                 AgentRole.COORDINATOR,
                 {"review": review, "status": "completed"}
             )
@@ -337,7 +711,7 @@ class ReviewerAgent(SpecializedAgent):
         
         Provide detailed review with suggestions."""
         
-        review = await self.think(prompt)
+        review = await self.think(prompt, batch=True)
         return self._parse_review(review)
 
     def _parse_review(self, response: str) -> Dict[str, Any]:
@@ -349,13 +723,17 @@ class ReviewerAgent(SpecializedAgent):
         }
 
 class SecurityAgent(SpecializedAgent):
-    def __init__(self, client, message_queue, shared_memory):
-        super().__init__(client, message_queue, shared_memory, AgentRole.SECURITY)
+    def __init__(self, transport, router, shared_memory):
+        super().__init__(transport, router, shared_memory, AgentRole.SECURITY)
+
+    def uses_batch(self, message: Message) -> bool:
+        return message.content.get("task") == "security_audit"
         
     async def handle_message(self, message: Message):
         if message.content["task"] == "security_audit":
             audit = await self.conduct_security_audit(message.content["context"])
-            await self.send_message(
+            await self.reply(
+                message,
                 AgentRole.COORDINATOR,
                 {"audit": audit, "status": "completed"}
             )
@@ -372,7 +750,7 @@ class SecurityAgent(SpecializedAgent):
         
         Provide comprehensive security analysis."""
         
-        audit = await self.think(prompt)
+        audit = await self.think(prompt, batch=True)
         return self._parse_audit(audit)
 
     def _parse_audit(self, response: str) -> Dict[str, Any]:
@@ -1,15 +1,18 @@
 """Core multi-agent system framework."""
 
-from typing import Dict, List, Any
+from typing import Dict, Any, AsyncIterator, Iterable, Optional, Set, Tuple
 import asyncio
+import itertools
 from dataclasses import dataclass
 from enum import Enum
-import anthropic
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from datetime import datetime
 from pathlib import Path
+from .interaction_log import get_interaction_log
 from .memory import SharedKnowledgeBase
+from ..context import ContextBuilder
+from ..transport import LLMTransport, DEFAULT_MODEL
 
 console = Console()
 
@@ -28,27 +31,111 @@ class Message:
     content: Dict[str, Any]
     priority: int = 1
 
+class MessageRouter:
+    """Deliver messages into one bounded priority mailbox per role.
+
+    Higher ``Message.priority`` values are dequeued first; messages of equal
+    priority keep their send order. A full mailbox makes ``send`` wait until
+    the receiving agent catches up.
+    """
+
+    def __init__(self, roles: Iterable[AgentRole], mailbox_size: int = 100):
+        self.mailbox_size = mailbox_size
+        self.mailboxes: Dict[AgentRole, asyncio.PriorityQueue] = {
+            role: asyncio.PriorityQueue(maxsize=mailbox_size)
+            for role in roles
+        }
+        self._sequence = itertools.count()
+
+    def _entry(self, message: Message) -> Tuple[int, int, Message]:
+        return (-message.priority, next(self._sequence), message)
+
+    async def send(self, message: Message):
+        """Deliver a message to its target mailbox, waiting if it is full."""
+        mailbox = self.mailboxes.get(message.to_role)
+        if mailbox is None:
+            raise ValueError(f"No mailbox registered for role: {message.to_role}")
+        await mailbox.put(self._entry(message))
+
+    async def receive(self, role: AgentRole) -> Message:
+        """Wait for the highest-priority message addressed to a role."""
+        _, _, message = await self.mailboxes[role].get()
+        return message
+
+    def task_done(self, role: AgentRole):
+        """Mark the last received message for a role as processed."""
+        self.mailboxes[role].task_done()
+
+    def pending(self, role: AgentRole) -> int:
+        """Number of messages waiting in a role's mailbox."""
+        return self.mailboxes[role].qsize()
+
 class SpecializedAgent:
     def __init__(
         self,
-        client: anthropic.Anthropic,
-        message_queue: asyncio.Queue,
+        transport: LLMTransport,
+        router: MessageRouter,
         shared_memory: SharedKnowledgeBase,
         role: AgentRole
     ):
-        self.client = client
-        self.message_queue = message_queue
+        self.transport = transport
+        self.router = router
         self.shared_memory = shared_memory
         self.role = role
         self.active = True
+        # Messages handled at the same time; set per role from agent settings
+        self.concurrency = 1
+        # Handlers detached from the workers while they wait on a message batch
+        self._detached: Set[asyncio.Task] = set()
+
+    # Content keys copied from a request into every message sent on its behalf
+    CORRELATION_KEYS = ("project_id", "stage")
 
     async def process_messages(self):
-        """Process incoming messages"""
+        """Process incoming messages, up to ``concurrency`` at a time"""
+        await asyncio.gather(*(
+            self._message_worker() for _ in range(max(1, self.concurrency))
+        ))
+
+    async def _message_worker(self):
         while self.active:
-            message = await self.message_queue.get()
-            if message.to_role == self.role:
-                await self.handle_message(message)
-            self.message_queue.task_done()
+            message = await self.router.receive(self.role)
+            try:
+                if self.transport.batcher is not None and self.uses_batch(message):
+                    # A batch can take hours; free the worker for the next message
+                    task = asyncio.ensure_future(self._handle(message))
+                    self._detached.add(task)
+                    task.add_done_callback(self._detached_done)
+                else:
+                    await self._handle(message)
+            finally:
+                self.router.task_done(self.role)
+
+    async def _handle(self, message: Message):
+        try:
+            await self.handle_message(message)
+        except Exception as e:
+            if "project_id" not in message.content:
+                raise
+            # Pipeline work fails its project rather than the whole network
+            console.print(
+                f"[red]Agent {self.role.value} failed on "
+                f"{message.content['project_id']}: {str(e)}[/red]"
+            )
+            await self.reply(
+                message,
+                AgentRole.COORDINATOR,
+                {"status": "failed", "error": str(e)}
+            )
+
+    def _detached_done(self, task: asyncio.Task):
+        self._detached.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            console.print(f"[red]Agent {self.role.value} failed: {str(task.exception())}[/red]")
+
+    def uses_batch(self, message: Message) -> bool:
+        """Whether handling ``message`` waits on a message batch when batching is enabled"""
+        return False
 
     async def handle_message(self, message: Message):
         """Handle incoming message based on role"""
@@ -62,55 +149,117 @@ class SpecializedAgent:
             content=content,
             priority=priority
         )
-        await self.message_queue.put(message)
+        await self.router.send(message)
+
+    def system_prompt(self, context: Optional[str] = None) -> str:
+        """Stable prompt prefix: role instructions plus any shared context
+
+        It is sent with a cache-control breakpoint, so it should change
+        rarely; anything that varies per call belongs in the prompt itself.
+        """
+        instructions = (
+            f"You are the {self.role.value} agent in a team of specialized AI agents "
+            f"that research, design, build, review and secure software projects. "
+            f"Answer as the {self.role.value}, concisely and in the structure requested."
+        )
+        return f"{instructions}\n\n{context}" if context else instructions
 
-    async def think(self, prompt: str) -> str:
-        """Use Claude to think about a problem"""
+    async def reply(self, message: Message, to_role: AgentRole, content: Dict[str, Any]):
+        """Send a message on behalf of ``message``, keeping its correlation keys"""
+        correlation = {
+            key: message.content[key]
+            for key in self.CORRELATION_KEYS
+            if key in message.content
+        }
+        await self.send_message(to_role, {**content, **correlation}, priority=message.priority)
+
+    async def think(self, prompt: str, batch: bool = False, context: Optional[str] = None) -> str:
+        """Use Claude to think about a problem
+
+        ``context`` is stable background (such as research results) that is
+        cached with the role instructions. With ``batch`` set and batching
+        enabled on the transport, the prompt joins the next message batch
+        instead of an interactive request.
+        """
+        if batch and self.transport.batcher is not None:
+            return await self.think_batched(prompt, context)
+        chunks = []
+        async for chunk in self.think_stream(prompt, context):
+            chunks.append(chunk)
+        return "".join(chunks)
+
+    async def think_stream(self, prompt: str, context: Optional[str] = None) -> AsyncIterator[str]:
+        """Think about a problem, yielding the response as it is generated"""
         try:
             console.print(f"\n[cyan]Agent {self.role.value} thinking about:[/cyan]")
             console.print(f"[dim]{prompt}[/dim]")
-            
-            response = self.client.messages.create(
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }],
-                model="claude-3-sonnet-20240229",
-                max_tokens=2000
-            )
-            
             console.print(f"\n[green]Agent {self.role.value} response:[/green]")
-            console.print(f"[yellow]{response.content}[/yellow]\n")
             
-            # Log to file
-            self._log_interaction(prompt, response.content)
+            chunks = []
+            async for chunk in self.transport.stream(
+                prompt,
+                DEFAULT_MODEL,
+                max_tokens=2000,
+                system=self.system_prompt(context)
+            ):
+                # Render live; markup is off because model text may contain brackets
+                console.print(chunk, end="", style="yellow", markup=False, highlight=False)
+                chunks.append(chunk)
+                yield chunk
+            console.print("\n")
             
-            return response.content
+            # Log to file
+            self._log_interaction(prompt, "".join(chunks))
         except Exception as e:
             console.print(f"[red]Error in think(): {str(e)}[/red]")
             raise
 
+    async def think_batched(self, prompt: str, context: Optional[str] = None) -> str:
+        """Think about a problem through the transport's batch dispatcher"""
+        try:
+            console.print(f"\n[cyan]Agent {self.role.value} queued for batch:[/cyan]")
+            console.print(f"[dim]{prompt}[/dim]")
+            response = await self.transport.batcher.submit(
+                prompt,
+                DEFAULT_MODEL,
+                max_tokens=2000,
+                system=self.system_prompt(context)
+            )
+            console.print(f"\n[green]Agent {self.role.value} batch response:[/green]")
+            console.print(response, style="yellow", markup=False, highlight=False)
+            self._log_interaction(prompt, response)
+            return response
+        except Exception as e:
+            console.print(f"[red]Error in think_batched(): {str(e)}[/red]")
+            raise
+
     def _log_interaction(self, prompt: str, response: str):
         """Log agent interactions to file"""
-        timestamp = datetime.now().isoformat()
-        log_dir = Path.home() / ".ai_agent_cli" / "logs" / "agents"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        log_file = log_dir / f"{self.role.value}_interactions.log"
-        
-        with open(log_file, 'a') as f:
-            f.write(f"\n{'='*50}\n")
-            f.write(f"Timestamp: {timestamp}\n")
-            f.write(f"Agent: {self.role.value}\n")
-            f.write(f"Prompt:\n{prompt}\n")
-            f.write(f"Response:\n{response}\n")
-            f.write(f"{'='*50}\n")
+        get_interaction_log().write(
+            f"agents/{self.role.value}_interactions",
+            {"agent": self.role.value, "prompt": prompt, "response": response}
+        )
 
 class AgentNetwork:
-    def __init__(self, anthropic_client: anthropic.Anthropic):
-        self.client = anthropic_client
-        self.message_queue = asyncio.Queue()
-        self.shared_memory = SharedKnowledgeBase()
+    def __init__(
+        self,
+        transport: LLMTransport,
+        mailbox_size: int = 100,
+        shared_memory: Optional[SharedKnowledgeBase] = None,
+        context_builder: Optional[ContextBuilder] = None,
+        agent_settings: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_concurrent_projects: int = 3,
+        github=None,
+        http_cache=None
+    ):
+        self.transport = transport
+        self.github = github
+        self.http_cache = http_cache
+        self.context_builder = context_builder
+        self.agent_settings = agent_settings or {}
+        self.max_concurrent_projects = max_concurrent_projects
+        self.router = MessageRouter(AgentRole, mailbox_size=mailbox_size)
+        self.shared_memory = shared_memory or SharedKnowledgeBase()
         self.agents: Dict[AgentRole, SpecializedAgent] = {}
         self.log_dir = Path.home() / ".ai_agent_cli" / "logs"
         self.log_dir.mkdir(parents=True, exist_ok=True)
@@ -129,13 +278,27 @@ class AgentNetwork:
         )
 
         self.agents = {
-            AgentRole.COORDINATOR: CoordinatorAgent(self.client, self.message_queue, self.shared_memory),
-            AgentRole.ARCHITECT: ArchitectAgent(self.client, self.message_queue, self.shared_memory),
-            AgentRole.RESEARCHER: ResearcherAgent(self.client, self.message_queue, self.shared_memory),
-            AgentRole.DEVELOPER: DeveloperAgent(self.client, self.message_queue, self.shared_memory),
-            AgentRole.REVIEWER: ReviewerAgent(self.client, self.message_queue, self.shared_memory),
-            AgentRole.SECURITY: SecurityAgent(self.client, self.message_queue, self.shared_memory)
+            AgentRole.COORDINATOR: CoordinatorAgent(
+                self.transport,
+                self.router,
+                self.shared_memory,
+                context_builder=self.context_builder,
+                max_concurrent_projects=self.max_concurrent_projects
+            ),
+            AgentRole.ARCHITECT: ArchitectAgent(self.transport, self.router, self.shared_memory),
+            AgentRole.RESEARCHER: ResearcherAgent(
+                self.transport,
+                self.router,
+                self.shared_memory,
+                github=self.github,
+                http_cache=self.http_cache
+            ),
+            AgentRole.DEVELOPER: DeveloperAgent(self.transport, self.router, self.shared_memory),
+            AgentRole.REVIEWER: ReviewerAgent(self.transport, self.router, self.shared_memory),
+            AgentRole.SECURITY: SecurityAgent(self.transport, self.router, self.shared_memory)
         }
+        for role, agent in self.agents.items():
+            agent.concurrency = self.agent_settings.get(role.value, {}).get("concurrency", 1)
 
     async def start(self):
         """Start the agent network"""
@@ -175,6 +338,8 @@ class AgentNetwork:
             except Exception as e:
                 console.print(f"[red]Error in agent network: {str(e)}[/red]")
                 raise
+            finally:
+                await self.shared_memory.aclose()
 
     async def broadcast_message(self, message: str):
         """Broadcast a message to all agents"""
@@ -183,8 +348,7 @@ class AgentNetwork:
         console.print(f"[magenta]{message}[/magenta]\n")
         
         # Log broadcast
-        with open(self.log_dir / "network_broadcasts.log", 'a') as f:
-            f.write(f"\n{'='*50}\n")
-            f.write(f"Timestamp: {timestamp}\n")
-            f.write(f"Broadcast: {message}\n")
-            f.write(f"{'='*50}\n")
\ No newline at end of file
+        get_interaction_log().write(
+            "network_broadcasts",
+            {"timestamp": timestamp, "broadcast": message}
+        )
\ No newline at end of file
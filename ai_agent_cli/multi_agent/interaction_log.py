@@ -0,0 +1,140 @@
+"""Background writer for agent interaction logs."""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+
+class InteractionLog:
+    """Append JSONL records to per-stream files from a background thread.
+
+    ``write`` only enqueues the record, so callers on the event loop never
+    touch the filesystem. The writer thread keeps each stream's file open,
+    gathers records for up to ``flush_interval`` seconds, writes them as
+    one batch per stream, and rotates a file to ``<name>.jsonl.1`` …
+    ``.<backup_count>`` once it exceeds ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        log_dir: Optional[Path] = None,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 3,
+        batch_size: int = 256,
+        flush_interval: float = 0.5
+    ):
+        self.log_dir = log_dir or Path.home() / ".ai_agent_cli" / "logs"
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.SimpleQueue[Optional[Tuple[str, Dict[str, Any]]]]" = queue.SimpleQueue()
+        self._files: Dict[str, IO[str]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def write(self, stream: str, record: Dict[str, Any]):
+        """Queue ``record`` for ``<log_dir>/<stream>.jsonl``."""
+        if self._thread is None:
+            self._start()
+        record.setdefault("timestamp", datetime.now().isoformat())
+        self._queue.put((stream, record))
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="interaction-log",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch: List[Tuple[str, Dict[str, Any]]] = []
+            stop = item is None
+            if item is not None:
+                batch.append(item)
+            # Collect what arrives within flush_interval into the same batch
+            deadline = time.monotonic() + self.flush_interval
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            self._write_batch(batch)
+            if stop:
+                break
+        for handle in self._files.values():
+            handle.close()
+        self._files.clear()
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        lines: Dict[str, List[str]] = {}
+        for stream, record in batch:
+            lines.setdefault(stream, []).append(json.dumps(record, default=str) + "\n")
+        for stream, stream_lines in lines.items():
+            try:
+                handle = self._open(stream)
+                handle.write("".join(stream_lines))
+                handle.flush()
+                if handle.tell() > self.max_bytes:
+                    self._rotate(stream)
+            except Exception as e:
+                logging.error(f"Error writing {stream} interaction log: {str(e)}")
+
+    def _path(self, stream: str) -> Path:
+        return self.log_dir / f"{stream}.jsonl"
+
+    def _open(self, stream: str) -> IO[str]:
+        handle = self._files.get(stream)
+        if handle is None:
+            path = self._path(stream)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(path, "a", encoding="utf-8")
+            self._files[stream] = handle
+        return handle
+
+    def _rotate(self, stream: str):
+        self._files.pop(stream).close()
+        path = self._path(stream)
+        for index in range(self.backup_count - 1, 0, -1):
+            source = path.with_name(f"{path.name}.{index}")
+            if source.exists():
+                os.replace(source, path.with_name(f"{path.name}.{index + 1}"))
+        if self.backup_count > 0:
+            os.replace(path, path.with_name(f"{path.name}.1"))
+        else:
+            path.unlink()
+
+    def close(self):
+        """Write everything queued so far and stop the writer thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+
+_interaction_log: Optional[InteractionLog] = None
+
+
+def get_interaction_log() -> InteractionLog:
+    """Return the shared interaction log, flushed when the process exits."""
+    global _interaction_log
+    if _interaction_log is None:
+        _interaction_log = InteractionLog()
+        atexit.register(_interaction_log.close)
+    return _interaction_log
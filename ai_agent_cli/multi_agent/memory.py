@@ -1,56 +1,175 @@
 """Shared memory management for multi-agent system."""
 
 import asyncio
-from typing import Dict, Any, Optional, List
-import json
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Any, Optional, List
 from pathlib import Path
 from datetime import datetime
 import logging
-import aiofiles
+
+from .storage import StorageBackend, LogStructuredBackend, Operation
+
+class ReadWriteLock:
+    """Asyncio lock that admits many concurrent readers or a single writer.
+
+    A waiting writer holds back new readers, so a steady stream of reads
+    cannot starve writes.
+    """
+
+    def __init__(self):
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @asynccontextmanager
+    async def reader(self):
+        """Hold the lock for reading."""
+        async with self.condition:
+            await self.condition.wait_for(
+                lambda: not self._writer and not self._waiting_writers
+            )
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self._readers -= 1
+                if not self._readers:
+                    self.condition.notify_all()
+
+    @asynccontextmanager
+    async def writer(self):
+        """Hold the lock exclusively."""
+        async with self.condition:
+            self._waiting_writers += 1
+            try:
+                await self.condition.wait_for(
+                    lambda: not self._writer and not self._readers
+                )
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self._writer = False
+                self.condition.notify_all()
 
 class SharedKnowledgeBase:
-    def __init__(self, storage_path: Optional[Path] = None):
-        """Initialize shared knowledge base."""
+    def __init__(
+        self,
+        storage_path: Optional[Path] = None,
+        backend: Optional[StorageBackend] = None,
+        flush_interval_ms: int = 0,
+        flush_max_writes: int = 100
+    ):
+        """Initialize shared knowledge base.
+
+        With ``flush_interval_ms`` set, writes are group-committed: they are
+        persisted at most once per interval, or as soon as
+        ``flush_max_writes`` operations are waiting. Call ``flush()`` or
+        ``aclose()`` to force pending writes to disk.
+        """
         self.storage_path = storage_path or Path.home() / ".ai_agent_cli" / "knowledge"
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.backend = backend or LogStructuredBackend(self.storage_path)
         self.memory: Dict[str, Any] = {}
-        self.lock = asyncio.Lock()
+        self.lock = ReadWriteLock()
+        # Operations committed in memory but not yet handed to the backend
+        self._pending: List[Operation] = []
+        self._persist_lock: Optional[asyncio.Lock] = None
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_writes = flush_max_writes
+        self._flush_timer: Optional[asyncio.Future] = None
+        self._listeners: List[Callable[[str, Optional[Dict[str, Any]]], None]] = []
         self.load_persistent_memory()
 
     def load_persistent_memory(self):
         """Load persistent memory from disk."""
-        memory_file = self.storage_path / "memory.json"
         try:
-            if memory_file.exists():
-                with open(memory_file, 'r') as f:
-                    self.memory = json.load(f)
+            self.memory = self.backend.load()
         except Exception as e:
             logging.error(f"Error loading persistent memory: {str(e)}")
             self.memory = {}
 
-    async def save_persistent_memory(self):
-        """Save memory to disk."""
-        memory_file = self.storage_path / "memory.json"
+    def add_listener(self, listener: Callable[[str, Optional[Dict[str, Any]]], None]):
+        """Call ``listener(key, entry)`` after every change; entry is None on delete."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, Optional[Dict[str, Any]]], None]):
+        """Stop notifying a previously added listener."""
+        self._listeners.remove(listener)
+
+    def _notify(self, key: str, entry: Optional[Dict[str, Any]]):
+        for listener in self._listeners:
+            try:
+                listener(key, entry)
+            except Exception as e:
+                logging.error(f"Error in memory listener: {str(e)}")
+
+    async def _persist(self):
+        """Write pending operations to the storage backend.
+
+        Runs outside the read/write lock. Pending operations are drained in
+        commit order, and backends that need a snapshot get a shallow copy
+        of memory taken at drain time, so no reader waits on disk I/O.
+        """
+        if self._persist_lock is None:
+            self._persist_lock = asyncio.Lock()
+        async with self._persist_lock:
+            if not self._pending:
+                return
+            ops, self._pending = self._pending, []
+            snapshot = dict(self.memory) if self.backend.needs_snapshot else None
+            await self.backend.write(ops, snapshot)
+
+    async def _commit(self):
+        """Persist pending operations now or leave them for the group commit."""
+        if not self.flush_interval or len(self._pending) >= self.flush_max_writes:
+            await self._persist()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
         try:
-            async with aiofiles.open(memory_file, 'w') as f:
-                await f.write(json.dumps(self.memory, indent=2))
-        except Exception as e:
-            logging.error(f"Error saving persistent memory: {str(e)}")
+            await asyncio.sleep(self.flush_interval)
+            # Shielded so aclose() cancelling the timer never interrupts a write
+            await asyncio.shield(self._persist())
+        finally:
+            self._flush_timer = None
+
+    async def flush(self):
+        """Write all pending operations to the storage backend."""
+        await self._persist()
 
     async def store(self, key: str, value: Any, persistent: bool = True):
         """Store data in shared memory."""
-        async with self.lock:
-            self.memory[key] = {
+        async with self.lock.writer():
+            previous = self.memory.get(key)
+            entry = {
                 'value': value,
                 'timestamp': datetime.now().isoformat(),
                 'persistent': persistent
             }
-            if persistent:
-                await self.save_persistent_memory()
+            self.memory[key] = entry
+            if persistent or self.backend.supports_queries:
+                self._pending.append(("put", key, entry))
+            elif previous and previous.get('persistent'):
+                self._pending.append(("delete", key, None))
+        self._notify(key, entry)
+        await self._commit()
 
     async def retrieve(self, key: str) -> Optional[Any]:
         """Retrieve data from shared memory."""
-        async with self.lock:
+        async with self.lock.reader():
             data = self.memory.get(key)
             return data['value'] if data else None
 
@@ -61,19 +180,31 @@ class SharedKnowledgeBase:
 
     async def delete(self, key: str):
         """Delete memory entry."""
-        async with self.lock:
-            if key in self.memory:
-                del self.memory[key]
-                await self.save_persistent_memory()
+        async with self.lock.writer():
+            if key not in self.memory:
+                return
+            del self.memory[key]
+            self._pending.append(("delete", key, None))
+        self._notify(key, None)
+        await self._commit()
 
     async def list_keys(self) -> List[str]:
         """List all memory keys."""
-        async with self.lock:
+        async with self.lock.reader():
             return list(self.memory.keys())
 
-    async def search(self, pattern: str) -> Dict[str, Any]:
-        """Search memory entries matching pattern."""
-        async with self.lock:
+    async def search(self, pattern: str, prefix: bool = False) -> Dict[str, Any]:
+        """Search memory entries whose key contains (or starts with) pattern."""
+        if self.backend.supports_queries:
+            await self.flush()
+            return await self.backend.search(pattern, prefix=prefix)
+        async with self.lock.reader():
+            if prefix:
+                return {
+                    k: v['value']
+                    for k, v in self.memory.items()
+                    if k.lower().startswith(pattern.lower())
+                }
             return {
                 k: v['value'] 
                 for k, v in self.memory.items() 
@@ -82,16 +213,24 @@ class SharedKnowledgeBase:
 
     async def clear_temporary(self):
         """Clear non-persistent memory entries."""
-        async with self.lock:
-            self.memory = {
-                k: v for k, v in self.memory.items() 
-                if v.get('persistent', False)
-            }
-            await self.save_persistent_memory()
+        async with self.lock.writer():
+            temporary = [
+                k for k, v in self.memory.items()
+                if not v.get('persistent', False)
+            ]
+            for k in temporary:
+                del self.memory[k]
+            self._pending.extend(("delete", k, None) for k in temporary)
+        for k in temporary:
+            self._notify(k, None)
+        await self._commit()
 
     async def get_recent(self, limit: int = 10) -> Dict[str, Any]:
         """Get most recent memory entries."""
-        async with self.lock:
+        if self.backend.supports_queries:
+            await self.flush()
+            return await self.backend.recent(limit)
+        async with self.lock.reader():
             sorted_entries = sorted(
                 self.memory.items(),
                 key=lambda x: x[1]['timestamp'],
@@ -100,4 +239,12 @@ class SharedKnowledgeBase:
             return {
                 k: v['value'] 
                 for k, v in sorted_entries[:limit]
-            }
\ No newline at end of file
+            }
+
+    async def aclose(self):
+        """Flush pending writes and release storage resources."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        await self.flush()
+        await self.backend.close()
@@ -0,0 +1,398 @@
+"""Persistence backends for the shared knowledge base."""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiofiles
+
+# ("put", key, entry) or ("delete", key, None)
+Operation = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+class StorageBackend:
+    """Base class for SharedKnowledgeBase persistence strategies."""
+
+    # Whether the next write needs a copy of the full memory; backends that
+    # only need one now and then override this with a property
+    needs_snapshot = False
+    # Queryable backends also receive temporary entries and answer
+    # search()/recent() themselves instead of scanning the in-memory dict
+    supports_queries = False
+
+    def load(self) -> Dict[str, Any]:
+        """Return the persisted entries."""
+        raise NotImplementedError
+
+    async def write(self, ops: List[Operation], snapshot: Optional[Dict[str, Any]] = None):
+        """Persist a batch of put/delete operations."""
+        raise NotImplementedError
+
+    async def close(self):
+        """Flush and release any open resources."""
+
+
+class JSONFileBackend(StorageBackend):
+    """Rewrite a single ``memory.json`` file on every write."""
+
+    needs_snapshot = True
+
+    def __init__(self, storage_path: Path):
+        self.memory_file = storage_path / "memory.json"
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            if self.memory_file.exists():
+                with open(self.memory_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logging.error(f"Error loading persistent memory: {str(e)}")
+        return {}
+
+    async def write(self, ops: List[Operation], snapshot: Optional[Dict[str, Any]] = None):
+        try:
+            # Serialise on a worker thread; the snapshot is a private copy
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(
+                None, functools.partial(json.dumps, snapshot, indent=2)
+            )
+            async with aiofiles.open(self.memory_file, 'w') as f:
+                await f.write(data)
+        except Exception as e:
+            logging.error(f"Error saving persistent memory: {str(e)}")
+
+
+class LogStructuredBackend(StorageBackend):
+    """Append each operation to a log and compact it into a snapshot.
+
+    Every write appends one JSON line per operation and flushes it, so a
+    crash loses at most the record being written. Appends run on a
+    dedicated worker thread, keeping file I/O and fsync off the event loop.
+    Once the log grows past ``compact_threshold`` bytes, the next write
+    asks for the store's snapshot; the log is then rotated and the snapshot
+    written to ``snapshot.json`` in the background. Startup loads the
+    snapshot and replays any rotated and live log records on top of it.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path,
+        compact_threshold: int = 4 * 1024 * 1024,
+        fsync: bool = False
+    ):
+        self.snapshot_file = storage_path / "snapshot.json"
+        self.log_file = storage_path / "memory.log"
+        self.compacting_file = storage_path / "memory.log.compacting"
+        self.legacy_file = storage_path / "memory.json"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._log = None
+        self._log_size = 0
+        self._compaction: Optional[asyncio.Future] = None
+        # One thread, so appends and log rotation stay in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-log-write")
+
+    @property
+    def needs_snapshot(self) -> bool:
+        return self._log_size >= self.compact_threshold and self._compaction is None
+
+    def load(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {}
+        migrating = False
+        try:
+            if self.snapshot_file.exists():
+                state = json.loads(self.snapshot_file.read_text())
+            elif self.legacy_file.exists():
+                # One-time migration from the single-file format; any log
+                # records were written on top of it and are replayed below
+                state = json.loads(self.legacy_file.read_text())
+                migrating = True
+        except Exception as e:
+            logging.error(f"Error loading memory snapshot: {str(e)}")
+
+        interrupted = self.compacting_file.exists()
+        for path in (self.compacting_file, self.log_file):
+            self._replay(path, state)
+
+        if interrupted or migrating:
+            # Fold everything into a snapshot before the log is reused, so
+            # later starts no longer depend on the legacy file
+            self._write_snapshot(dict(state))
+            if interrupted:
+                self.compacting_file.unlink()
+            self._log = open(self.log_file, 'w', encoding='utf-8')
+        else:
+            self._log = open(self.log_file, 'a', encoding='utf-8')
+        self._log_size = self.log_file.stat().st_size
+        return dict(state)
+
+    def _replay(self, path: Path, state: Dict[str, Any]):
+        """Apply the records of a log file to ``state``."""
+        if not path.exists():
+            return
+        valid_bytes = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final record from a crash; everything before it is intact
+                    logging.warning(f"Discarding truncated record at end of {path}")
+                    break
+                if record["op"] == "put":
+                    state[record["key"]] = record["entry"]
+                else:
+                    state.pop(record["key"], None)
+                valid_bytes += len(line)
+        if valid_bytes < path.stat().st_size:
+            # Drop the torn tail so new records are not appended onto it
+            os.truncate(path, valid_bytes)
+
+    def _append(self, ops: List[Operation], rotate: bool = False) -> int:
+        lines = []
+        for op, key, entry in ops:
+            if op == "put":
+                lines.append(json.dumps({"op": "put", "key": key, "entry": entry}))
+            else:
+                lines.append(json.dumps({"op": "delete", "key": key}))
+        data = "\n".join(lines) + "\n"
+        self._log.write(data)
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        if rotate:
+            # In the same job as the append, so the rotated log ends with
+            # exactly the operations the snapshot covers
+            self._log.close()
+            os.replace(self.log_file, self.compacting_file)
+            self._log = open(self.log_file, 'a', encoding='utf-8')
+            return 0
+        return len(data)
+
+    async def write(self, ops: List[Operation], snapshot: Optional[Dict[str, Any]] = None):
+        compact = snapshot is not None and self._compaction is None
+        try:
+            loop = asyncio.get_running_loop()
+            size = await loop.run_in_executor(self._executor, self._append, ops, compact)
+        except Exception as e:
+            logging.error(f"Error appending to memory log: {str(e)}")
+            return
+
+        if compact:
+            self._log_size = 0
+            self._compaction = asyncio.ensure_future(self._compact(snapshot))
+        else:
+            self._log_size += size
+
+    async def _compact(self, snapshot: Dict[str, Any]):
+        """Replace the rotated log with the store's snapshot.
+
+        ``snapshot`` was taken when the last rotated operations were handed
+        over, so it covers exactly the records in the rotated log.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._fold, snapshot)
+        except Exception as e:
+            logging.error(f"Error compacting memory log: {str(e)}")
+        finally:
+            self._compaction = None
+
+    def _fold(self, snapshot: Dict[str, Any]):
+        # Temporary entries are never logged, so they stay out of the snapshot too
+        self._write_snapshot({
+            key: entry for key, entry in snapshot.items()
+            if entry.get('persistent', True)
+        })
+        self.compacting_file.unlink()
+
+    def _write_snapshot(self, state: Dict[str, Any]):
+        """Atomically replace the snapshot file."""
+        tmp_file = self.snapshot_file.with_suffix(".json.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+    async def close(self):
+        if self._compaction is not None:
+            await self._compaction
+        if self._log is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._log.close)
+            self._log = None
+        self._executor.shutdown(wait=False)
+
+
+class SQLiteBackend(StorageBackend):
+    """Store entries in an indexed SQLite database.
+
+    The database runs in WAL mode so readers never wait for the writer.
+    All statements execute on dedicated worker threads, one for writes and
+    one for reads, keeping the event loop free. ``recent`` is an index range
+    scan on the timestamp column and ``search`` uses an FTS5 trigram index
+    when the SQLite build provides one.
+    """
+
+    supports_queries = True
+
+    def __init__(self, storage_path: Path):
+        self.db_file = storage_path / "memory.db"
+        self.fts = False
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-sqlite-write")
+        self._read_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-sqlite-read")
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                key_lower TEXT NOT NULL,
+                value TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                persistent INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_key_lower ON entries(key_lower);
+            CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
+        """)
+        try:
+            conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                    key, content='entries', content_rowid='rowid', tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+                    INSERT INTO entries_fts(rowid, key) VALUES (new.rowid, new.key);
+                END;
+                CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+                    INSERT INTO entries_fts(entries_fts, rowid, key) VALUES ('delete', old.rowid, old.key);
+                END;
+            """)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            logging.info(f"FTS5 trigram index unavailable, using key scans: {str(e)}")
+        conn.commit()
+
+    def load(self) -> Dict[str, Any]:
+        self._write_conn = self._connect()
+        self._create_schema(self._write_conn)
+        self._read_conn = self._connect()
+
+        # Temporary entries do not outlive the process
+        self._write_conn.execute("DELETE FROM entries WHERE persistent = 0")
+        self._write_conn.commit()
+        rows = self._write_conn.execute(
+            "SELECT key, value, timestamp, persistent FROM entries"
+        )
+        return {
+            key: {
+                'value': json.loads(value),
+                'timestamp': timestamp,
+                'persistent': bool(persistent)
+            }
+            for key, value, timestamp, persistent in rows
+        }
+
+    def _apply(self, ops: List[Operation]):
+        conn = self._write_conn
+        with conn:
+            for op, key, entry in ops:
+                # Delete-then-insert keeps the FTS triggers simple
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                if op == "put":
+                    conn.execute(
+                        "INSERT INTO entries (key, key_lower, value, timestamp, persistent) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (
+                            key,
+                            key.lower(),
+                            json.dumps(entry['value']),
+                            entry['timestamp'],
+                            int(entry['persistent'])
+                        )
+                    )
+
+    async def write(self, ops: List[Operation], snapshot: Optional[Dict[str, Any]] = None):
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._write_executor, self._apply, ops)
+        except Exception as e:
+            logging.error(f"Error writing to memory database: {str(e)}")
+
+    async def _read(self, query: str, params: Tuple) -> List[Tuple[str, str]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._read_executor,
+            lambda: self._read_conn.execute(query, params).fetchall()
+        )
+
+    async def search(self, pattern: str, prefix: bool = False) -> Dict[str, Any]:
+        """Return entries whose key contains (or starts with) ``pattern``."""
+        needle = pattern.lower()
+        if prefix:
+            rows = await self._read(
+                "SELECT key, value FROM entries WHERE key_lower >= ? AND key_lower < ?",
+                (needle, needle + "\uffff")
+            )
+        elif self.fts and len(needle) >= 3:
+            rows = await self._read(
+                "SELECT e.key, e.value FROM entries_fts f "
+                "JOIN entries e ON e.rowid = f.rowid WHERE entries_fts MATCH ?",
+                ('"' + needle.replace('"', '""') + '"',)
+            )
+        else:
+            rows = await self._read(
+                "SELECT key, value FROM entries WHERE instr(key_lower, ?) > 0",
+                (needle,)
+            )
+        return {key: json.loads(value) for key, value in rows}
+
+    async def recent(self, limit: int) -> Dict[str, Any]:
+        """Return the ``limit`` most recently written entries."""
+        rows = await self._read(
+            "SELECT key, value FROM entries ORDER BY timestamp DESC LIMIT ?",
+            (limit,)
+        )
+        return {key: json.loads(value) for key, value in rows}
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        for conn, executor in (
+            (self._write_conn, self._write_executor),
+            (self._read_conn, self._read_executor)
+        ):
+            if conn is not None:
+                await loop.run_in_executor(executor, conn.close)
+            executor.shutdown(wait=False)
+        self._write_conn = None
+        self._read_conn = None
+
+
+def create_backend(storage_path: Path, settings: Optional[Dict[str, Any]] = None) -> StorageBackend:
+    """Create the backend selected by the ``memory`` config section."""
+    settings = settings or {}
+    name = settings.get("backend", "log")
+    if name == "json":
+        return JSONFileBackend(storage_path)
+    if name == "log":
+        return LogStructuredBackend(
+            storage_path,
+            compact_threshold=settings.get("compact_threshold", 4 * 1024 * 1024),
+            fsync=settings.get("fsync", False)
+        )
+    if name == "sqlite":
+        return SQLiteBackend(storage_path)
+    raise ValueError(f"Unknown memory backend: {name}")
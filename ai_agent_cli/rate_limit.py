@@ -0,0 +1,169 @@
+"""Shared rate limiting and retry scheduling for outbound calls."""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class RetryableError(Exception):
+    """Raised by a rate-limited call that should be retried.
+
+    ``retry_after`` carries the delay the upstream asked for, if any.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Async token bucket holding up to ``capacity`` and refilling continuously."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        """Wait until ``amount`` tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # The lock makes waiters queue in arrival order
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.refill_per_second)
+                self._refill()
+            self.tokens -= amount
+
+
+class RateLimiter:
+    """Request and token budgets plus retry policy for one upstream service.
+
+    Callers wait in line for budget instead of failing. Calls that raise
+    ``RetryableError`` are retried with jittered exponential backoff, or
+    after the upstream's ``Retry-After`` delay when one is given, and that
+    delay pauses every caller of the same upstream.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        requests_per_hour: Optional[float] = None,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.request_buckets = []
+        if requests_per_minute:
+            self.request_buckets.append(TokenBucket(requests_per_minute, requests_per_minute / 60))
+        if requests_per_hour:
+            self.request_buckets.append(TokenBucket(requests_per_hour, requests_per_hour / 3600))
+        self.token_bucket = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+            if tokens_per_minute else None
+        )
+        self.paused_until = 0.0
+        self.stats: Dict[str, int] = {"calls": 0, "retries": 0, "failures": 0}
+
+    def pause(self, seconds: float):
+        """Hold back all callers for ``seconds``."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, tokens: int = 0):
+        """Wait for any pause to end and for request/token budget."""
+        delay = self.paused_until - time.monotonic()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.paused_until - time.monotonic()
+        for bucket in self.request_buckets:
+            await bucket.acquire(1)
+        if self.token_bucket is not None and tokens:
+            await self.token_bucket.acquire(tokens)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given attempt number."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def call(self, func: Callable[[], Awaitable[Any]], tokens: int = 0) -> Any:
+        """Run ``func`` within the budget, retrying ``RetryableError``."""
+        attempt = 0
+        while True:
+            await self.acquire(tokens)
+            self.stats["calls"] += 1
+            try:
+                return await func()
+            except RetryableError as e:
+                if attempt >= self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                if e.retry_after is not None:
+                    delay = e.retry_after + random.uniform(0, self.base_delay)
+                    self.pause(delay)
+                else:
+                    delay = self.backoff(attempt)
+                attempt += 1
+                self.stats["retries"] += 1
+                logging.warning(
+                    f"{self.name} call throttled ({str(e)}); "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+
+DEFAULT_LIMITS: Dict[str, Dict[str, Any]] = {
+    "anthropic": {"requests_per_minute": 50, "tokens_per_minute": 40000},
+    "github": {"requests_per_hour": 5000},
+}
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def configure_limiter(name: str, **settings) -> RateLimiter:
+    """Create (or replace) the shared limiter for an upstream."""
+    limiter = RateLimiter(name, **{**DEFAULT_LIMITS.get(name, {}), **settings})
+    _limiters[name] = limiter
+    return limiter
+
+
+def get_limiter(name: str) -> RateLimiter:
+    """Return the shared limiter for an upstream, creating it with defaults."""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = configure_limiter(name)
+    return limiter
@@ -1,11 +1,52 @@
 # ai_agent_cli/reasoning.py
-from typing import List, Dict, Any, Optional
+from typing import Deque, List, Dict, Any, Optional
+from collections import deque
 from dataclasses import dataclass
+import hashlib
 import json
+import logging
+import os
 from pathlib import Path
-import anthropic
 from datetime import datetime
 
+from .context import ContextBuilder, Section
+from .retrieval import KnowledgeIndex, ThoughtIndex, thought_text
+from .transport import LLMTransport
+
+REASONING_MODEL = "claude-3-opus-20240229"
+# Thoughts kept in memory; older ones stay in the journal on disk
+RECENT_THOUGHTS = 50
+# Cosine score below which a retrieved memory is treated as unrelated
+MIN_RELEVANCE = 0.05
+# Step types the single-agent executor knows how to run
+PLAN_STEP_TYPES = ("analyze_trends", "generate_project", "implement_feature")
+PLAN_FORMAT = """Respond with only a JSON object of this shape:
+{"goal": "...", "context": {}, "success_metrics": ["..."],
+ "steps": [{"id": "1", "type": "analyze_trends", "depends_on": [], "parameters": {}, "validation": "..."}]}
+Each step's type is one of: analyze_trends, generate_project, implement_feature.
+implement_feature steps also need a "file_path". depends_on lists the ids of
+the steps that must finish first; use [] for steps that can start at once."""
+
+
+def _tail_lines(path: Path, count: int, block_size: int = 8192) -> List[str]:
+    """Return the last ``count`` non-empty lines of a file, reading backwards"""
+    if count <= 0 or not path.exists():
+        return []
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b""
+        # Until the start of the file is reached, the first piece may be partial
+        while position > 0 and sum(1 for line in data.split(b"\n")[1:] if line.strip()) < count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    pieces = data.split(b"\n")
+    if position > 0:
+        pieces = pieces[1:]
+    lines = [line.decode("utf-8", errors="replace") for line in pieces if line.strip()]
+    return lines[-count:]
+
 @dataclass
 class Thought:
     content: str
@@ -22,63 +63,160 @@ class Plan:
     status: str = "in_progress"
 
 class ReasoningEngine:
-    def __init__(self, anthropic_client, memory_path: Path):
-        self.client = anthropic_client
+    def __init__(
+        self,
+        transport: LLMTransport,
+        memory_path: Path,
+        context_builder: Optional[ContextBuilder] = None
+    ):
+        self.transport = transport
+        self.context_builder = context_builder or ContextBuilder()
         self.memory_path = memory_path
         self.memory_path.mkdir(parents=True, exist_ok=True)
         self.context_file = self.memory_path / "context.json"
-        self.thoughts_file = self.memory_path / "thoughts.json"
+        self.thoughts_file = self.memory_path / "thoughts.jsonl"
+        self.legacy_thoughts_file = self.memory_path / "thoughts.json"
+        self.knowledge_index: Optional[KnowledgeIndex] = None
         self.load_memory()
 
     def load_memory(self):
-        """Load existing memory and context"""
+        """Load the context and the most recent thoughts"""
         self.context = {}
-        self.thoughts = []
-        
+        self._context_hash = self._hash_context(self.context)
+        self.thoughts: Deque[Thought] = deque(maxlen=RECENT_THOUGHTS)
+
         if self.context_file.exists():
             self.context = json.loads(self.context_file.read_text())
-        if self.thoughts_file.exists():
-            self.thoughts = [Thought(**t) for t in json.loads(self.thoughts_file.read_text())]
+            self._context_hash = self._hash_context(self.context)
+        if self.legacy_thoughts_file.exists() and not self.thoughts_file.exists():
+            # One-time migration from the single-file format
+            self._migrate_thoughts()
+        self._drop_torn_thought()
+        self.thoughts.extend(self._read_thoughts(RECENT_THOUGHTS))
+        self.thought_index = ThoughtIndex(self.thoughts_file)
+
+    def attach_knowledge(self, shared_memory):
+        """Also retrieve relevant entries from a shared knowledge base"""
+        self.knowledge_index = KnowledgeIndex(shared_memory)
+
+    def _drop_torn_thought(self):
+        """Cut a partial last line left by a crash, so new thoughts start on a fresh line"""
+        if not self.thoughts_file.exists():
+            return
+        with open(self.thoughts_file, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if not size:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            position = size
+            while position > 0:
+                step = min(8192, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b"\n")
+                if newline >= 0:
+                    position += newline + 1
+                    break
+            logging.warning(f"Discarding truncated thought at end of {self.thoughts_file}")
+            f.truncate(position)
+
+    def _migrate_thoughts(self):
+        legacy = json.loads(self.legacy_thoughts_file.read_text())
+        tmp_file = self.thoughts_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            for data in legacy:
+                f.write(json.dumps(data) + "\n")
+        os.replace(tmp_file, self.thoughts_file)
+
+    def recent_thoughts(self, limit: int = 5) -> List[Thought]:
+        """Return the last ``limit`` thoughts, reading only the tail of the journal"""
+        # The in-memory window holds the whole journal until it first fills up
+        if limit <= len(self.thoughts) or len(self.thoughts) < RECENT_THOUGHTS:
+            return list(self.thoughts)[max(0, len(self.thoughts) - limit):] if limit > 0 else []
+        return self._read_thoughts(limit)
+
+    def _read_thoughts(self, limit: int) -> List[Thought]:
+        thoughts = []
+        for line in _tail_lines(self.thoughts_file, limit):
+            try:
+                thoughts.append(Thought(**json.loads(line)))
+            except (ValueError, TypeError) as e:
+                logging.warning(f"Skipping unreadable thought: {str(e)}")
+        return thoughts
+
+    def record_thought(self, thought: Thought):
+        """Append a thought to the journal and index it for retrieval"""
+        data = vars(thought)
+        with open(self.thoughts_file, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write((json.dumps(data, default=str) + "\n").encode("utf-8"))
+        self.thoughts.append(thought)
+        self.thought_index.append(offset, thought_text(data))
+
+    def relevant_thoughts(self, query: str, limit: int = 5) -> List[Thought]:
+        """Return the thoughts most similar to ``query``, or the newest if none match"""
+        thoughts = []
+        for offset, _ in self.thought_index.search(query, limit, MIN_RELEVANCE):
+            try:
+                thoughts.append(Thought(**self.thought_index.read(offset)))
+            except (ValueError, TypeError) as e:
+                logging.warning(f"Skipping unreadable thought: {str(e)}")
+        return thoughts or self.recent_thoughts(limit)
+
+    @staticmethod
+    def _hash_context(context: Dict[str, Any]) -> str:
+        return hashlib.sha256(
+            json.dumps(context, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
 
     def save_memory(self):
-        """Save current memory state"""
-        self.context_file.write_text(json.dumps(self.context, indent=2))
-        thoughts_data = [vars(t) for t in self.thoughts]
-        self.thoughts_file.write_text(json.dumps(thoughts_data, indent=2))
+        """Save the context if it changed; thoughts are journaled as they are recorded"""
+        context_hash = self._hash_context(self.context)
+        if context_hash == self._context_hash:
+            return
+        tmp_file = self.context_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(self.context, indent=2, default=str))
+        os.replace(tmp_file, self.context_file)
+        self._context_hash = context_hash
 
     async def reason_about_task(self, task: str, context: Dict[str, Any]) -> Plan:
         """Generate a reasoned plan for a given task"""
-        # Combine task with relevant context and history
-        recent_thoughts = self.thoughts[-5:] if self.thoughts else []
-        thought_history = "\n".join([f"Previous thought: {t.content}" for t in recent_thoughts])
+        # Combine task with the most relevant context and history
+        query = f"{task} {json.dumps(context, default=str)}"
+        relevant_thoughts = self.relevant_thoughts(query, 5)
+        thought_history = "\n".join([f"Previous thought: {t.content}" for t in relevant_thoughts])
+        knowledge = ""
+        if self.knowledge_index is not None:
+            knowledge = "\n".join(
+                f"{key}: {json.dumps(value, default=str)}"
+                for key, value in self.knowledge_index.lookup(query, 5, MIN_RELEVANCE)
+            )
         
         prompt = f"""Task: {task}
 
 Current Context:
 {json.dumps(context, indent=2)}
 
-Recent Thoughts:
+Relevant Thoughts:
 {thought_history}
 
+Relevant Knowledge:
+{knowledge or 'None'}
+
 Please analyze this task and create a detailed plan. Consider:
 1. Previous experiences and outcomes
 2. Potential challenges and risks
 3. Dependencies and prerequisites
 4. Success criteria
 
-Format your response as a structured plan with:
-- Main goal
-- Detailed steps (including validation points)
-- Required context
-- Success metrics"""
+{PLAN_FORMAT}"""
 
-        response = await self.client.messages.create(
-            model="claude-3-opus-20240229",
-            messages=[{"role": "user", "content": prompt}]
-        )
+        response = await self.transport.complete(prompt, REASONING_MODEL)
         
         # Parse Claude's response into a structured plan
-        plan_data = self._parse_plan_response(response.content)
+        plan_data = self._parse_plan_response(response)
         return Plan(**plan_data)
 
     async def evaluate_outcome(self, action: str, result: Any, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -98,12 +236,9 @@ Evaluate:
 
 Provide structured analysis."""
 
-        response = await self.client.messages.create(
-            model="claude-3-opus-20240229",
-            messages=[{"role": "user", "content": prompt}]
-        )
+        response = await self.transport.complete(prompt, REASONING_MODEL)
         
-        evaluation = self._parse_evaluation(response.content)
+        evaluation = self._parse_evaluation(response)
         
         # Record thought about this outcome
         thought = Thought(
@@ -112,18 +247,28 @@ Provide structured analysis."""
             context=context,
             outcome=evaluation['success']
         )
-        self.thoughts.append(thought)
+        self.record_thought(thought)
         self.save_memory()
         
         return evaluation
 
     async def adapt_plan(self, current_plan: Plan, new_information: Dict[str, Any]) -> Plan:
         """Adapt current plan based on new information"""
+        steps = current_plan.steps
+        done = current_plan.current_step
+        plan_context = await self.context_builder.build([
+            Section("Goal", {
+                "goal": current_plan.goal,
+                "status": current_plan.status,
+                "current_step": done
+            }, priority=4),
+            Section("Remaining Steps", steps[done:], priority=3),
+            Section("New Information", new_information, priority=3),
+            Section("Completed Steps", steps[:done], priority=1),
+            Section("Plan Context", current_plan.context, priority=0)
+        ])
         prompt = f"""Current Plan:
-{json.dumps(vars(current_plan), indent=2)}
-
-New Information:
-{json.dumps(new_information, indent=2)}
+{plan_context}
 
 Please analyze if and how the current plan should be adapted based on this new information.
 Consider:
@@ -132,27 +277,48 @@ Consider:
 3. Risk adjustments
 4. Priority changes
 
-Provide updated plan structure."""
+Provide the updated plan. {PLAN_FORMAT}"""
 
-        response = await self.client.messages.create(
-            model="claude-3-opus-20240229",
-            messages=[{"role": "user", "content": prompt}]
-        )
+        response = await self.transport.complete(prompt, REASONING_MODEL)
         
-        updated_plan_data = self._parse_plan_response(response.content)
+        updated_plan_data = self._parse_plan_response(response)
         return Plan(**updated_plan_data)
 
     def _parse_plan_response(self, response: str) -> Dict[str, Any]:
-        """Parse Claude's response into a structured plan"""
-        # In a real implementation, this would properly parse Claude's response
-        # This is a simplified version
+        """Parse Claude's JSON plan into steps the scheduler can run
+
+        A response without a usable plan gives a failed plan with no steps,
+        so the caller stops rather than executing steps it cannot run.
+        """
+        try:
+            data = json.loads(response[response.index("{"):response.rindex("}") + 1])
+            steps = [self._parse_step(step) for step in data["steps"]]
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Unusable plan response: {str(e)}")
+            return {
+                "goal": "",
+                "steps": [],
+                "current_step": 0,
+                "context": {"error": f"unusable plan: {str(e)}"},
+                "status": "failed"
+            }
+        context = data.get("context")
         return {
-            "goal": "Extracted goal",
-            "steps": [{"step": "Extracted step"}],
+            "goal": str(data.get("goal", "")),
+            "steps": steps,
             "current_step": 0,
-            "context": {},
+            "context": context if isinstance(context, dict) else {},
         }
 
+    @staticmethod
+    def _parse_step(step: Any) -> Dict[str, Any]:
+        if not isinstance(step, dict) or step.get("type") not in PLAN_STEP_TYPES:
+            raise ValueError(f"step has no known type: {step}")
+        if step["type"] == "implement_feature" and not step.get("file_path"):
+            raise ValueError(f"implement_feature step has no file_path: {step}")
+        parameters = step.get("parameters")
+        return {**step, "parameters": parameters if isinstance(parameters, dict) else {}}
+
     def _parse_evaluation(self, response: str) -> Dict[str, Any]:
         """Parse Claude's evaluation response"""
         # In a real implementation, this would properly parse Claude's response
@@ -0,0 +1,212 @@
+"""Local vector retrieval over thoughts and shared knowledge."""
+
+import json
+import logging
+import math
+import re
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+
+
+class HashingVectorizer:
+    """Embed text as L2-normalised, signed feature-hashed word and bigram counts.
+
+    Purely local and stateless, so vectors stay comparable across runs
+    without a fitted vocabulary.
+    """
+
+    def __init__(self, dim: int = 2048):
+        self.dim = dim
+
+    def features(self, text: str) -> List[str]:
+        words = TOKEN_PATTERN.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def transform(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in Counter(self.features(text)).items():
+            # crc32 rather than hash() so buckets are stable between processes
+            digest = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dim] += sign * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """Cosine top-k search over a growable NumPy matrix of unit vectors.
+
+    Rows are appended in place (capacity doubles as needed) and removed
+    by swapping in the last row, so updates never rebuild the matrix.
+    """
+
+    def __init__(self, vectorizer: Optional[HashingVectorizer] = None):
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.keys: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+        self._matrix = np.zeros((0, self.vectorizer.dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._matrix[:len(self.keys)]
+
+    def add(self, key: Hashable, text: str):
+        """Index ``text`` under ``key``, replacing any previous vector."""
+        self.add_vector(key, self.vectorizer.transform(text))
+
+    def add_vector(self, key: Hashable, vector: np.ndarray):
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self._matrix):
+                grown = np.zeros((max(16, row * 2), self.vectorizer.dim), dtype=np.float32)
+                grown[:row] = self._matrix[:row]
+                self._matrix = grown
+            self.keys.append(key)
+            self._rows[key] = row
+        self._matrix[row] = vector
+
+    def remove(self, key: Hashable):
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self.keys) - 1
+        if row != last:
+            self._matrix[row] = self._matrix[last]
+            self.keys[row] = self.keys[last]
+            self._rows[self.keys[row]] = row
+        self.keys.pop()
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[Hashable, float]]:
+        """Return up to ``k`` ``(key, score)`` pairs, best first."""
+        if not self.keys or k <= 0:
+            return []
+        scores = self.vectors @ self.vectorizer.transform(query)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        # Ties go to later rows, which for append-only data are the newer ones
+        top = sorted(top, key=lambda row: (-scores[row], -row))
+        return [(self.keys[row], float(scores[row])) for row in top if scores[row] > min_score]
+
+
+class ThoughtIndex(VectorIndex):
+    """Vector index over a JSONL journal, keyed by each line's byte offset.
+
+    Vectors and offsets are appended to ``<journal>.vectors`` and
+    ``<journal>.offsets`` as thoughts are recorded, so startup loads them
+    with two reads and only indexes journal lines written since.
+    """
+
+    def __init__(self, journal: Path, vectorizer: Optional[HashingVectorizer] = None):
+        super().__init__(vectorizer)
+        self.journal = journal
+        self.vectors_file = journal.with_name(journal.name + ".vectors")
+        self.offsets_file = journal.with_name(journal.name + ".offsets")
+        self._load()
+
+    def _load(self):
+        try:
+            vectors = np.fromfile(self.vectors_file, dtype=np.float32) if self.vectors_file.exists() else None
+            offsets = np.fromfile(self.offsets_file, dtype=np.int64) if self.offsets_file.exists() else None
+        except Exception as e:
+            logging.warning(f"Rebuilding thought index: {str(e)}")
+            vectors = offsets = None
+        if vectors is not None and offsets is not None and vectors.size % self.vectorizer.dim == 0:
+            # A crash between the two appends leaves one file a row ahead
+            count = min(len(offsets), vectors.size // self.vectorizer.dim)
+            self._matrix = vectors[:count * self.vectorizer.dim].reshape(count, self.vectorizer.dim).copy()
+            self.keys = [int(offset) for offset in offsets[:count]]
+            self._rows = {key: row for row, key in enumerate(self.keys)}
+            if count != len(offsets) or count != len(vectors) // self.vectorizer.dim:
+                self._rewrite()
+        elif self.vectors_file.exists() or self.offsets_file.exists():
+            self._rewrite()
+
+        journal_size = self.journal.stat().st_size if self.journal.exists() else 0
+        if self.keys and max(self.keys) >= journal_size:
+            # The journal was replaced or truncated; index it from scratch
+            self.keys, self._rows = [], {}
+            self._rewrite()
+
+        # Index anything journaled since the index was last written
+        start = self._next_offset()
+        if journal_size > start:
+            with open(self.journal, "rb") as f:
+                f.seek(start)
+                offset = start
+                for line in f:
+                    if line.endswith(b"\n") and line.strip():
+                        try:
+                            self.append(offset, thought_text(json.loads(line)))
+                        except ValueError:
+                            pass
+                    offset += len(line)
+
+    def _next_offset(self) -> int:
+        if not self.keys:
+            return 0
+        last = max(self.keys)
+        with open(self.journal, "rb") as f:
+            f.seek(last)
+            return last + len(f.readline())
+
+    def _rewrite(self):
+        self.vectors.tofile(self.vectors_file)
+        np.asarray(self.keys, dtype=np.int64).tofile(self.offsets_file)
+
+    def append(self, offset: int, text: str):
+        """Index the journal line starting at byte ``offset``."""
+        vector = self.vectorizer.transform(text)
+        self.add_vector(offset, vector)
+        with open(self.vectors_file, "ab") as f:
+            vector.tofile(f)
+        with open(self.offsets_file, "ab") as f:
+            np.asarray([offset], dtype=np.int64).tofile(f)
+
+    def read(self, offset: int) -> Dict[str, Any]:
+        """Read the journal entry at ``offset``."""
+        with open(self.journal, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+
+def thought_text(data: Dict[str, Any]) -> str:
+    """Text of a journaled thought used for embedding."""
+    return f"{data.get('content', '')} {json.dumps(data.get('context', {}), default=str)}"
+
+
+class KnowledgeIndex(VectorIndex):
+    """Vector index over ``SharedKnowledgeBase`` entries, kept current by its listener."""
+
+    def __init__(self, shared_memory, vectorizer: Optional[HashingVectorizer] = None):
+        super().__init__(vectorizer)
+        self.shared_memory = shared_memory
+        for key, entry in shared_memory.memory.items():
+            self._on_change(key, entry)
+        shared_memory.add_listener(self._on_change)
+
+    def _on_change(self, key: str, entry: Optional[Dict[str, Any]]):
+        if entry is None:
+            self.remove(key)
+        else:
+            self.add(key, f"{key} {json.dumps(entry.get('value'), default=str)}")
+
+    def lookup(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[str, Any]]:
+        """Return ``(key, value)`` for the ``k`` entries most relevant to ``query``."""
+        return [
+            (key, self.shared_memory.memory[key]["value"])
+            for key, _ in self.search(query, k, min_score)
+            if key in self.shared_memory.memory
+        ]
@@ -0,0 +1,139 @@
+"""Concurrent execution of plan steps along their dependencies."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .reasoning import Plan
+
+StepRunner = Callable[[Dict[str, Any]], Awaitable[Any]]
+PlanAdapter = Callable[[Plan, Dict[str, Any]], Awaitable[Plan]]
+
+
+def step_id(step: Dict[str, Any], index: int) -> str:
+    """A step's ``id``, defaulting to its position in the plan."""
+    return str(step.get("id", index))
+
+
+def step_dependencies(steps: List[Dict[str, Any]]) -> List[Set[str]]:
+    """Resolve each step's ``depends_on`` into a set of step ids.
+
+    A step without ``depends_on`` depends on the step before it, so plans
+    written as plain sequences still run in order; ``depends_on: []``
+    marks a step as independent.
+    """
+    ids = [step_id(step, index) for index, step in enumerate(steps)]
+    known = set(ids)
+    dependencies = []
+    for index, step in enumerate(steps):
+        if "depends_on" in step:
+            depends_on = step["depends_on"]
+            if isinstance(depends_on, (str, int)):
+                depends_on = [depends_on]
+            resolved = {str(dependency) for dependency in depends_on}
+        else:
+            resolved = {ids[index - 1]} if index else set()
+        unknown = resolved - known
+        if unknown:
+            raise ValueError(f"Step {ids[index]} depends on unknown steps: {sorted(unknown)}")
+        dependencies.append(resolved)
+    return dependencies
+
+
+class PlanScheduler:
+    """Run plan steps as a DAG, starting each once its dependencies finish.
+
+    At most ``max_concurrency`` steps run at once. When a step fails, no new
+    steps are started; the ones already running are allowed to finish, and
+    the plan is handed to ``adapt`` with the error before execution resumes
+    on the adapted plan. After ``max_adaptations`` adapted plans have also
+    failed, the plan is marked failed instead of being adapted again.
+    """
+
+    def __init__(
+        self,
+        run_step: StepRunner,
+        adapt: PlanAdapter,
+        max_concurrency: int = 3,
+        max_adaptations: int = 3
+    ):
+        self.run_step = run_step
+        self.adapt = adapt
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_adaptations = max(0, max_adaptations)
+
+    async def run(self, plan: Plan) -> Plan:
+        """Execute ``plan`` to completion, adapting it after failures."""
+        # Finished steps, kept across adaptations while the plan still has them unchanged
+        completed: Dict[str, Dict[str, Any]] = {}
+        adaptations = 0
+        while plan.status == "in_progress":
+            failure = await self._run_steps(plan, completed)
+            if failure is None:
+                plan.status = "completed"
+                break
+            step, error = failure
+            if adaptations >= self.max_adaptations:
+                logging.error(f"Giving up on plan after {adaptations} adaptations")
+                plan.status = "failed"
+                break
+            adaptations += 1
+            plan = await self.adapt(plan, {
+                "error": str(error),
+                "step": step,
+                "completed_steps": list(completed)
+            })
+        return plan
+
+    async def _run_steps(
+        self,
+        plan: Plan,
+        completed: Dict[str, Dict[str, Any]]
+    ) -> Optional[Tuple[Dict[str, Any], Exception]]:
+        """Run the remaining steps; return the first failure, if any."""
+        steps = plan.steps
+        ids = [step_id(step, index) for index, step in enumerate(steps)]
+        dependencies = step_dependencies(steps)
+        done = set(ids[:plan.current_step]) | {
+            ids[index]
+            for index, step in enumerate(steps)
+            if completed.get(ids[index]) == step
+        }
+        pending = [index for index in range(plan.current_step, len(steps)) if ids[index] not in done]
+        running: Dict[asyncio.Task, int] = {}
+        failure = None
+
+        try:
+            while pending or running:
+                if failure is None:
+                    for index in list(pending):
+                        if len(running) >= self.max_concurrency:
+                            break
+                        if dependencies[index] <= done:
+                            pending.remove(index)
+                            running[asyncio.ensure_future(self.run_step(steps[index]))] = index
+                if not running:
+                    if failure is None:
+                        blocked = [ids[index] for index in pending]
+                        raise ValueError(f"Plan steps have circular dependencies: {blocked}")
+                    break
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    index = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        done.add(ids[index])
+                        completed[ids[index]] = steps[index]
+                        continue
+                    logging.error(f"Step {ids[index]} failed: {str(error)}")
+                    if failure is None:
+                        failure = (steps[index], error)
+
+                # Keep current_step at the first unfinished step for adapt_plan
+                while plan.current_step < len(steps) and ids[plan.current_step] in done:
+                    plan.current_step += 1
+        finally:
+            for task in running:
+                task.cancel()
+        return failure
@@ -0,0 +1,283 @@
+"""Shared asynchronous transport for Anthropic model calls."""
+
+import asyncio
+import contextlib
+import functools
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import anthropic
+from anthropic import AsyncAnthropic
+
+from .cache import ResponseCache
+from .rate_limit import RateLimiter, RetryableError, get_limiter, parse_retry_after
+
+DEFAULT_MODEL = "claude-3-sonnet-20240229"
+
+
+def response_text(response: Any) -> str:
+    """Return the text of a Messages API response."""
+    content = getattr(response, "content", response)
+    if isinstance(content, str):
+        return content
+    return "".join(
+        getattr(block, "text", "")
+        for block in content
+        if getattr(block, "type", "text") == "text"
+    )
+
+
+async def iter_lines(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Regroup streamed text chunks into complete lines."""
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+def estimate_tokens(params: Dict[str, Any]) -> int:
+    """Rough token cost of a request: ~4 characters per input token plus output."""
+    characters = sum(len(str(message.get("content", ""))) for message in params.get("messages", []))
+    characters += sum(len(block.get("text", "")) for block in params.get("system", None) or [])
+    return characters // 4 + params.get("max_tokens", 0)
+
+
+def system_blocks(system: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    """Wrap a stable prompt prefix in a system block marked for prompt caching."""
+    if not system:
+        return None
+    return [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+
+
+def _retryable(error: Exception) -> Optional[RetryableError]:
+    """Map throttling and overload errors from the API to ``RetryableError``."""
+    if isinstance(error, anthropic.APIStatusError) and error.status_code in (429, 500, 503, 529):
+        return RetryableError(
+            f"HTTP {error.status_code}",
+            parse_retry_after(error.response.headers.get("retry-after"))
+        )
+    if isinstance(error, anthropic.APIConnectionError):
+        return RetryableError(str(error))
+    return None
+
+
+class LLMTransport:
+    def __init__(
+        self,
+        client: Any = None,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[RateLimiter] = None
+    ):
+        """Initialize the transport.
+
+        ``AsyncAnthropic`` clients are awaited directly. Any other client is
+        treated as synchronous and its calls run on a bounded thread pool, so
+        a slow request never stalls the event loop. When a ``cache`` is given,
+        identical requests are answered from it without calling the model.
+        Requests wait for the shared ``anthropic`` rate limiter, which also
+        retries throttled calls, unless another ``limiter`` is passed.
+        """
+        # Retries are scheduled by the limiter, not inside the SDK
+        self.client = client if client is not None else AsyncAnthropic(api_key=api_key, max_retries=0)
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.limiter = limiter or get_limiter("anthropic")
+        self.is_async = (
+            isinstance(self.client, AsyncAnthropic)
+            or inspect.iscoroutinefunction(self.client.messages.create)
+        )
+        # Set to a BatchDispatcher to allow batched, non-interactive calls
+        self.batcher: Optional[Any] = None
+        self.usage: Dict[str, int] = {
+            "input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "output_tokens": 0
+        }
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the loop that actually runs the agents
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="llm-transport"
+            )
+        return self._executor
+
+    async def _call(self, method, **params) -> Any:
+        """Invoke a client method without blocking the event loop."""
+        if self.is_async:
+            return await method(**params)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            functools.partial(method, **params)
+        )
+
+    async def request(self, method, tokens: int = 0, **params) -> Any:
+        """Call any client method within the rate limit and ``max_concurrency``."""
+        async def attempt():
+            async with self._get_semaphore():
+                try:
+                    return await self._call(method, **params)
+                except Exception as e:
+                    retryable = _retryable(e)
+                    if retryable is None:
+                        raise
+                    raise retryable from e
+
+        return await self.limiter.call(attempt, tokens=tokens)
+
+    def record_usage(self, response: Any):
+        """Add a response's token usage, including prompt-cache reads, to ``usage``."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        for field in self.usage:
+            self.usage[field] += getattr(usage, field, None) or 0
+        cached = getattr(usage, "cache_read_input_tokens", None) or 0
+        if cached:
+            logging.debug(f"{cached} input tokens served from prompt cache")
+
+    async def create(self, **params) -> Any:
+        """Send a Messages API request."""
+        response = await self.request(
+            self.client.messages.create,
+            tokens=estimate_tokens(params),
+            **params
+        )
+        self.record_usage(response)
+        return response
+
+    def build_params(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        system: Optional[str]
+    ) -> Dict[str, Any]:
+        """Messages API parameters for a single-turn prompt."""
+        params: Dict[str, Any] = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        if system:
+            params["system"] = system_blocks(system)
+        return params
+
+    def cache_key(self, params: Dict[str, Any]) -> str:
+        """Response-cache key for a request built by ``build_params``."""
+        return self.cache.make_key(
+            params["model"],
+            params["messages"],
+            params["max_tokens"],
+            **({"system": params["system"]} if "system" in params else {})
+        )
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        max_tokens: int = 2000,
+        system: Optional[str] = None
+    ) -> str:
+        """Send a single-turn prompt and return the response text.
+
+        ``system`` is a stable prefix (role instructions, shared context)
+        sent with a cache-control breakpoint, so repeated calls that share
+        it are billed for cached input instead of fresh input.
+        """
+        params = self.build_params(prompt, model, max_tokens, system)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache_key(params)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        response = await self.create(**params)
+        text = response_text(response)
+        if cache_key is not None:
+            await self.cache.put(cache_key, text)
+        return text
+
+    async def stream(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        max_tokens: int = 2000,
+        system: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Send a single-turn prompt and yield the response text as it arrives.
+
+        ``system`` is cached as in ``complete``. Cached responses are yielded
+        whole. Synchronous clients, and clients without ``messages.stream``,
+        cannot stream, so their complete response is yielded as one chunk.
+        The concurrency slot is held while a stream is open, but not while a
+        throttled attempt waits to be retried.
+        """
+        params = self.build_params(prompt, model, max_tokens, system)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache_key(params)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        if not self.is_async or not hasattr(self.client.messages, "stream"):
+            text = response_text(await self.create(**params))
+            yield text
+        else:
+            parts = []
+            semaphore = self._get_semaphore()
+            async with contextlib.AsyncExitStack() as stack:
+                async def open_stream():
+                    # Throttling surfaces when the stream opens, before any text
+                    await semaphore.acquire()
+                    try:
+                        manager = self.client.messages.stream(**params)
+                        response = await manager.__aenter__()
+                    except BaseException as e:
+                        # Includes cancellation, which must not leak the slot
+                        semaphore.release()
+                        retryable = _retryable(e)
+                        if retryable is None:
+                            raise
+                        raise retryable from e
+                    # Unwound in reverse: the stream closes, then the slot frees
+                    stack.callback(semaphore.release)
+                    stack.push_async_exit(manager)
+                    return response
+
+                response = await self.limiter.call(open_stream, tokens=estimate_tokens(params))
+                async for chunk in response.text_stream:
+                    parts.append(chunk)
+                    yield chunk
+                self.record_usage(await response.get_final_message())
+            text = "".join(parts)
+
+        if cache_key is not None:
+            await self.cache.put(cache_key, text)
+
+    def close(self) -> None:
+        """Release the offload thread pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -1,93 +1,274 @@
 """Utility functions for the AI agent system."""
 
+import asyncio
+import atexit
+import copy
+import gzip
 import logging
+import os
+import queue
+import shutil
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-from github import Github
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
 from rich.logging import RichHandler
 from rich.console import Console
 import aiohttp
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 from datetime import datetime
 import yaml
 
+from .http_cache import HTTPCache, fetch_page
+
+if TYPE_CHECKING:
+    from .github_client import GitHubClient
+
 console = Console()
 
-def setup_logging(log_file: Optional[Path] = None, level: str = "INFO") -> logging.Logger:
-    """Configure logging with rich output and file handler."""
+# Prefer the C-backed lxml parser; fall back to the pure-Python one
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+def _has_class(name: str):
+    """SoupStrainer matcher for one class of a multi-valued class attribute."""
+    def match(value) -> bool:
+        if value is None:
+            return False
+        return name in (value.split() if isinstance(value, str) else value)
+    return match
+
+# Only build trees for the subtrees each scraper actually reads
+COMMIT_STRAINER = SoupStrainer("div", class_=_has_class("TimelineItem-body"))
+ISSUE_STRAINER = SoupStrainer("div", class_=_has_class("js-issue-row"))
+TRENDING_STRAINER = SoupStrainer("article", class_=_has_class("Box-row"))
+
+def make_soup(html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse HTML with the fastest available parser."""
+    return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only)
+
+def _text(element, default: str = "") -> str:
+    """Return an element's stripped text, or ``default`` if it is missing."""
+    return element.text.strip() if element is not None else default
+
+def _compress_rotated(source: str, dest: str):
+    """Rotate a log file into a gzip archive."""
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+class _LocalQueueHandler(QueueHandler):
+    """Queue records for a listener in this process, keeping ``exc_info``.
+
+    The stock ``prepare`` formats the traceback into the message and drops
+    ``exc_info`` so records can be pickled. These records never leave the
+    process, so it is kept for RichHandler to render.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Merge the arguments now, while they still hold their logged values
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+_log_listener: Optional[QueueListener] = None
+
+def _stop_log_listener():
+    """Flush queued log records and stop the listener thread."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+def setup_logging(
+    log_file: Optional[Path] = None,
+    level: str = "INFO",
+    max_size: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    compress_backups: bool = False
+) -> logging.Logger:
+    """Configure logging with rich output and a rotating file handler.
+
+    Loggers only enqueue records; a background listener formats them and
+    writes to the console and to ``log_file``, which rolls over at
+    ``max_size`` bytes keeping ``backup_count`` old files (gzipped when
+    ``compress_backups`` is set).
+    """
+    global _log_listener
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
-    handlers = [RichHandler(console=console, rich_tracebacks=True)]
+    rich_handler = RichHandler(console=console, rich_tracebacks=True)
+    rich_handler.setFormatter(logging.Formatter("%(message)s"))
+    handlers: List[logging.Handler] = [rich_handler]
     if log_file:
-        file_handler = logging.FileHandler(log_file)
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=max_size,
+            backupCount=backup_count,
+            encoding="utf-8"
+        )
         file_handler.setFormatter(logging.Formatter(log_format))
+        if compress_backups:
+            file_handler.namer = lambda name: f"{name}.gz"
+            file_handler.rotator = _compress_rotated
         handlers.append(file_handler)
 
-    logging.basicConfig(
-        level=getattr(logging, level.upper()),
-        format="%(message)s",
-        handlers=handlers
-    )
+    if _log_listener is None:
+        atexit.register(_stop_log_listener)
+    _stop_log_listener()
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_LocalQueueHandler(log_queue))
+    root.setLevel(getattr(logging, level.upper()))
+    _log_listener.start()
 
     logger = logging.getLogger("ai_agent")
     return logger
 
-def create_github_client(token: str) -> Github:
-    """Create authenticated GitHub client with connection test."""
-    try:
-        client = Github(token)
-        # Test connection
-        user = client.get_user()
-        user.login  # This will raise an exception if authentication fails
-        return client
-    except Exception as e:
-        console.print(f"[red]Error connecting to GitHub: {str(e)}[/red]")
-        raise
+def create_http_session(
+    max_connections: int = 32,
+    max_connections_per_host: int = 8,
+    keepalive_timeout: float = 30
+) -> aiohttp.ClientSession:
+    """Create a pooled keep-alive session for scraping GitHub pages.
+
+    ``max_connections`` caps concurrent requests across all hosts, so it
+    doubles as the global concurrency limit for repository analysis.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=max_connections,
+        limit_per_host=max_connections_per_host,
+        keepalive_timeout=keepalive_timeout
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=60)
+    )
+
+async def _fetch_html(
+    session: aiohttp.ClientSession,
+    url: str,
+    require_ok: bool = True,
+    cache: Optional[HTTPCache] = None
+) -> str:
+    """Fetch a page body, raising on non-200 responses if ``require_ok``."""
+    if cache is not None:
+        return await cache.fetch(session, url, require_ok)
+    status, body, _ = await fetch_page(session, url)
+    if require_ok and status != 200:
+        raise ValueError(f"Failed to fetch {url}: {status}")
+    return body
 
-async def analyze_repository(repo_url: str) -> Dict[str, Any]:
-    """Analyze a GitHub repository for various metrics."""
-    async with aiohttp.ClientSession() as session:
-        repo_info = await _fetch_repository_info(session, repo_url)
-        repo_info.update(await _analyze_repository_activity(session, repo_url))
-        return repo_info
+async def analyze_repository(
+    repo_url: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    cache: Optional[HTTPCache] = None,
+    github: Optional["GitHubClient"] = None
+) -> Dict[str, Any]:
+    """Analyze a GitHub repository for various metrics.
 
-async def _fetch_repository_info(session: aiohttp.ClientSession, repo_url: str) -> Dict[str, Any]:
+    With a ``github`` client the metrics come from the GraphQL API, and the
+    repository pages are only scraped if that lookup fails.
+    """
+    if github is not None:
+        metadata = await github.repository_metadata([repo_url])
+        if repo_url in metadata:
+            return metadata[repo_url]
+
+    if session is None:
+        async with create_http_session() as session:
+            return await analyze_repository(repo_url, session, cache)
+
+    repo_info, activity = await asyncio.gather(
+        _fetch_repository_info(session, repo_url, cache),
+        _analyze_repository_activity(session, repo_url, cache)
+    )
+    repo_info.update(activity)
+    return repo_info
+
+async def analyze_repositories(
+    repo_urls: List[str],
+    session: Optional[aiohttp.ClientSession] = None,
+    max_connections: int = 32,
+    max_connections_per_host: int = 8,
+    cache: Optional[HTTPCache] = None,
+    github: Optional["GitHubClient"] = None
+) -> List[Dict[str, Any]]:
+    """Analyze many repositories concurrently over one pooled session.
+
+    With a ``github`` client, repositories are first looked up in batched
+    GraphQL queries and only the ones that lookup misses are scraped.
+    Results are returned in the order of ``repo_urls``; a repository that
+    fails to load is reported as ``{"url": ..., "error": ...}``.
+    """
+    metadata: Dict[str, Dict[str, Any]] = {}
+    if github is not None:
+        metadata = await github.repository_metadata(repo_urls)
+    missing = [url for url in dict.fromkeys(repo_urls) if url not in metadata]
+
+    if missing:
+        if session is None:
+            async with create_http_session(max_connections, max_connections_per_host) as session:
+                scraped = await analyze_repositories(missing, session, cache=cache)
+        else:
+            scraped = await asyncio.gather(
+                *(analyze_repository(url, session, cache) for url in missing),
+                return_exceptions=True
+            )
+        metadata.update(zip(missing, scraped))
+
+    analyses = []
+    for url in repo_urls:
+        result = metadata[url]
+        if isinstance(result, Exception):
+            logging.error(f"Error analyzing repository {url}: {str(result)}")
+            result = {"url": url, "error": str(result)}
+        analyses.append(result)
+    return analyses
+
+async def _fetch_repository_info(
+    session: aiohttp.ClientSession,
+    repo_url: str,
+    cache: Optional[HTTPCache] = None
+) -> Dict[str, Any]:
     """Fetch basic repository information."""
-    async with session.get(repo_url) as response:
-        if response.status != 200:
-            raise ValueError(f"Failed to fetch repository: {response.status}")
-            
-        html = await response.text()
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        return {
-            "url": repo_url,
-            "name": extract_repo_name(repo_url),
-            "stars": extract_stars(soup),
-            "forks": extract_forks(soup),
-            "languages": extract_languages(soup),
-            "topics": extract_topics(soup),
-            "last_updated": extract_last_updated(soup)
-        }
+    html = await _fetch_html(session, repo_url, cache=cache)
+    soup = make_soup(html)
+    
+    return {
+        "url": repo_url,
+        "name": extract_repo_name(repo_url),
+        "stars": extract_stars(soup),
+        "forks": extract_forks(soup),
+        "languages": extract_languages(soup),
+        "topics": extract_topics(soup),
+        "last_updated": extract_last_updated(soup)
+    }
 
-async def _analyze_repository_activity(session: aiohttp.ClientSession, repo_url: str) -> Dict[str, Any]:
+async def _analyze_repository_activity(
+    session: aiohttp.ClientSession,
+    repo_url: str,
+    cache: Optional[HTTPCache] = None
+) -> Dict[str, Any]:
     """Analyze repository activity and engagement."""
     base_url = repo_url.rstrip('/')
     
-    # Analyze commits
-    commits_url = f"{base_url}/commits"
-    async with session.get(commits_url) as response:
-        html = await response.text()
-        soup = BeautifulSoup(html, 'html.parser')
-        commit_activity = analyze_commit_activity(soup)
-
-    # Analyze issues
-    issues_url = f"{base_url}/issues"
-    async with session.get(issues_url) as response:
-        html = await response.text()
-        soup = BeautifulSoup(html, 'html.parser')
-        issue_activity = analyze_issue_activity(soup)
+    # Fetch the commits and issues pages concurrently
+    commits_html, issues_html = await asyncio.gather(
+        _fetch_html(session, f"{base_url}/commits", require_ok=False, cache=cache),
+        _fetch_html(session, f"{base_url}/issues", require_ok=False, cache=cache)
+    )
+    commit_activity = analyze_commit_activity(make_soup(commits_html, COMMIT_STRAINER))
+    issue_activity = analyze_issue_activity(make_soup(issues_html, ISSUE_STRAINER))
 
     return {
         "activity": {
@@ -143,12 +324,12 @@ def analyze_commit_activity(soup: BeautifulSoup) -> Dict[str, Any]:
     
     commits = []
     for element in commit_elements:
-        commit_info = {
-            "message": element.find("a", {"class": "Link--primary"}).text.strip() if element.find("a", {"class": "Link--primary"}) else "",
-            "author": element.find("a", {"class": "commit-author"}).text.strip() if element.find("a", {"class": "commit-author"}) else "",
-            "timestamp": element.find("relative-time").get("datetime") if element.find("relative-time") else ""
-        }
-        commits.append(commit_info)
+        time_element = element.find("relative-time")
+        commits.append({
+            "message": _text(element.find("a", {"class": "Link--primary"})),
+            "author": _text(element.find("a", {"class": "commit-author"})),
+            "timestamp": time_element.get("datetime", "") if time_element is not None else ""
+        })
     
     return {
         "recent_commits": commits[:10],
@@ -161,42 +342,45 @@ def analyze_issue_activity(soup: BeautifulSoup) -> Dict[str, Any]:
     
     issues = []
     for element in issue_elements:
-        issue_info = {
-            "title": element.find("a", {"class": "Link--primary"}).text.strip() if element.find("a", {"class": "Link--primary"}) else "",
+        comments = element.find("a", {"class": "Link--muted"})
+        issues.append({
+            "title": _text(element.find("a", {"class": "Link--primary"})),
             "state": "open" if element.find("span", {"class": "open"}) else "closed",
-            "comments": int(element.find("a", {"class": "Link--muted"}).text.strip()) if element.find("a", {"class": "Link--muted"}) else 0
-        }
-        issues.append(issue_info)
+            "comments": int(_text(comments, "0") or 0)
+        })
     
     return {
-        "open_issues": len([i for i in issues if i["state"] == "open"]),
-        "closed_issues": len([i for i in issues if i["state"] == "closed"]),
+        "open_issues": sum(1 for i in issues if i["state"] == "open"),
+        "closed_issues": sum(1 for i in issues if i["state"] == "closed"),
         "recent_issues": issues[:5]
     }
 
-async def fetch_trending_projects(session: aiohttp.ClientSession, days: int = 7) -> List[Dict[str, Any]]:
+async def fetch_trending_projects(
+    session: aiohttp.ClientSession,
+    days: int = 7,
+    cache: Optional[HTTPCache] = None
+) -> List[Dict[str, Any]]:
     """Fetch trending projects from GitHub."""
     url = f"https://github.com/trending?since={days}d"
-    async with session.get(url) as response:
-        html = await response.text()
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        trending = []
-        repo_elements = soup.find_all("article", {"class": "Box-row"})
-        
-        for repo in repo_elements:
-            repo_link = repo.find("h2", {"class": "h3"}).find("a")
-            repo_url = f"https://github.com{repo_link.get('href')}"
-            
-            trending.append({
-                "url": repo_url,
-                "name": repo_link.text.strip(),
-                "description": repo.find("p", {"class": "col-9"}).text.strip() if repo.find("p", {"class": "col-9"}) else "",
-                "language": repo.find("span", {"class": "d-inline-block ml-0 mr-3"}).text.strip() if repo.find("span", {"class": "d-inline-block ml-0 mr-3"}) else "",
-                "stars": repo.find("a", {"class": "Link--muted d-inline-block mr-3"}).text.strip() if repo.find("a", {"class": "Link--muted d-inline-block mr-3"}) else "0"
-            })
+    html = await _fetch_html(session, url, require_ok=False, cache=cache)
+    return extract_trending(make_soup(html, TRENDING_STRAINER))
+
+def extract_trending(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    """Extract repositories from the trending page."""
+    trending = []
+    for repo in soup.find_all("article", {"class": "Box-row"}):
+        repo_link = repo.find("h2", {"class": "h3"}).find("a")
+        repo_url = f"https://github.com{repo_link.get('href')}"
         
-        return trending
+        trending.append({
+            "url": repo_url,
+            "name": repo_link.text.strip(),
+            "description": _text(repo.find("p", {"class": "col-9"})),
+            "language": _text(repo.find("span", {"class": "d-inline-block ml-0 mr-3"})),
+            "stars": _text(repo.find("a", {"class": "Link--muted d-inline-block mr-3"}), "0")
+        })
+    
+    return trending
 
 def generate_project_structure(project_type: str, project_path: Path) -> None:
     """Generate basic project structure based on type."""
@@ -0,0 +1,53 @@
+"""Benchmark full versus strained parsing of saved GitHub pages.
+
+Usage: python benchmarks/parse_benchmark.py [iterations]
+
+Parses each fixture page in tests/fixtures/github with the default parser
+(lxml when installed, else html.parser), both as a full tree and through
+the SoupStrainer its scraper uses, and prints the mean time per parse.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from ai_agent_cli.utils import (
+    COMMIT_STRAINER,
+    HTML_PARSER,
+    ISSUE_STRAINER,
+    TRENDING_STRAINER,
+    analyze_commit_activity,
+    analyze_issue_activity,
+    extract_trending,
+    make_soup,
+)
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "github"
+
+PAGES = [
+    ("commits.html", COMMIT_STRAINER, analyze_commit_activity),
+    ("issues.html", ISSUE_STRAINER, analyze_issue_activity),
+    ("trending.html", TRENDING_STRAINER, extract_trending),
+]
+
+
+def mean_ms(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"parser: {HTML_PARSER}, {iterations} iterations")
+    print(f"{'page':<16}{'size':>10}{'full ms':>12}{'strained ms':>14}{'speed-up':>10}")
+    for name, strainer, extract in PAGES:
+        html = (FIXTURES / name).read_text(encoding="utf-8")
+        full = mean_ms(lambda: extract(make_soup(html)), iterations)
+        strained = mean_ms(lambda: extract(make_soup(html, strainer)), iterations)
+        print(f"{name:<16}{len(html):>10,}{full:>12.2f}{strained:>14.2f}{full / strained:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
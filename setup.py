@@ -5,19 +5,22 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     install_requires=[
-        "anthropic>=0.7.0",
+        "anthropic>=0.40.0",
         "aiohttp>=3.8.0",
         "aiofiles>=0.8.0",
         "beautifulsoup4>=4.9.3",
         "click>=8.0.0",
+        "numpy>=1.21.0",
         "pandas>=1.3.0",
-        "PyGithub>=1.55",
         "python-dotenv>=0.19.0",
         "requests>=2.28.0",
         "rich>=12.0.0",
         "pyyaml>=6.0",
         "typing-extensions>=4.0.0",
     ],
+    extras_require={
+        "fast": ["lxml>=4.9.0"],
+    },
     entry_points={
         "console_scripts": [
             "ai-agent=ai_agent_cli.agent:main",
@@ -0,0 +1,164 @@
+"""Tests for message batch dispatch against a fake batch endpoint."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ai_agent_cli.batch import BatchDispatcher, BatchRequestError
+from ai_agent_cli.multi_agent import core
+from ai_agent_cli.multi_agent.agents import CoordinatorAgent, ReviewerAgent
+from ai_agent_cli.multi_agent.core import AgentRole, Message, MessageRouter
+from ai_agent_cli.multi_agent.memory import SharedKnowledgeBase
+from ai_agent_cli.rate_limit import RateLimiter
+from ai_agent_cli.transport import LLMTransport
+
+
+def text_message(text):
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=text)],
+        usage=SimpleNamespace(input_tokens=10, output_tokens=5)
+    )
+
+
+class FakeBatches:
+    """Message Batches endpoint that ends each batch after a few polls."""
+
+    def __init__(self, polls=2, fail=()):
+        self.polls = polls
+        self.fail = set(fail)
+        self.created = []
+        self._batches = {}
+
+    async def create(self, requests):
+        batch_id = f"batch-{len(self.created)}"
+        self.created.append(requests)
+        self._batches[batch_id] = {"requests": requests, "polls": 0}
+        return SimpleNamespace(id=batch_id, processing_status="in_progress")
+
+    async def retrieve(self, message_batch_id):
+        batch = self._batches[message_batch_id]
+        batch["polls"] += 1
+        status = "ended" if batch["polls"] >= self.polls else "in_progress"
+        return SimpleNamespace(id=message_batch_id, processing_status=status)
+
+    async def results(self, message_batch_id):
+        async def items():
+            for request in self._batches[message_batch_id]["requests"]:
+                prompt = request["params"]["messages"][0]["content"]
+                if prompt in self.fail:
+                    result = SimpleNamespace(type="errored", error="invalid_request")
+                else:
+                    result = SimpleNamespace(type="succeeded", message=text_message(f"echo:{prompt}"))
+                yield SimpleNamespace(custom_id=request["custom_id"], result=result)
+        return items()
+
+
+class FakeClient:
+    def __init__(self, batches):
+        self.messages = SimpleNamespace(batches=batches, create=self.create)
+
+    async def create(self, **params):
+        raise AssertionError("interactive call made while batching")
+
+
+def make_transport(batches, max_batch_size=100):
+    transport = LLMTransport(FakeClient(batches), limiter=RateLimiter("test"))
+    transport.batcher = BatchDispatcher(
+        transport,
+        max_batch_size=max_batch_size,
+        max_wait=0.05,
+        poll_interval=0.01
+    )
+    return transport
+
+
+def test_prompts_are_grouped_into_one_batch():
+    batches = FakeBatches()
+    transport = make_transport(batches)
+
+    async def run():
+        return await asyncio.gather(*(transport.batcher.submit(f"p{index}") for index in range(5)))
+
+    assert asyncio.run(run()) == [f"echo:p{index}" for index in range(5)]
+    assert len(batches.created) == 1
+    assert len(batches.created[0]) == 5
+    assert transport.usage["input_tokens"] == 50
+
+
+def test_full_batches_are_sent_immediately():
+    batches = FakeBatches()
+    transport = make_transport(batches, max_batch_size=3)
+
+    async def run():
+        return await asyncio.gather(*(transport.batcher.submit(f"p{index}") for index in range(7)))
+
+    assert len(asyncio.run(run())) == 7
+    assert [len(requests) for requests in batches.created] == [3, 3, 1]
+
+
+def test_batches_leave_the_interactive_token_budget_alone():
+    batches = FakeBatches()
+    transport = make_transport(batches)
+    transport.limiter = RateLimiter("test", tokens_per_minute=1000)
+
+    async def run():
+        return await asyncio.gather(*(transport.batcher.submit("p" * 4000) for _ in range(3)))
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert transport.limiter.token_bucket.tokens > 990
+
+
+def test_failed_requests_only_fail_their_caller():
+    batches = FakeBatches(fail={"bad"})
+    transport = make_transport(batches)
+
+    async def run():
+        return await asyncio.gather(
+            transport.batcher.submit("good"),
+            transport.batcher.submit("bad"),
+            return_exceptions=True
+        )
+
+    good, bad = asyncio.run(run())
+    assert good == "echo:good"
+    assert isinstance(bad, BatchRequestError)
+
+
+def test_reviewer_workers_are_released_while_a_batch_is_pending(monkeypatch):
+    monkeypatch.setattr(core, "get_interaction_log", lambda: SimpleNamespace(write=lambda *args: None))
+    batches = FakeBatches()
+    transport = make_transport(batches)
+    router = MessageRouter(AgentRole)
+
+    async def run():
+        reviewer = ReviewerAgent(transport, router, None)
+        reviewer.concurrency = 1
+        for index in range(4):
+            await router.send(Message(
+                from_role=AgentRole.DEVELOPER,
+                to_role=AgentRole.REVIEWER,
+                content={"code": f"code {index}", "context": {}, "project_id": f"project-{index}", "stage": "development"}
+            ))
+        workers = asyncio.ensure_future(reviewer.process_messages())
+        replies = [await router.receive(AgentRole.COORDINATOR) for _ in range(4)]
+        reviewer.active = False
+        workers.cancel()
+        return replies
+
+    replies = asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert sorted(reply.content["project_id"] for reply in replies) == [f"project-{index}" for index in range(4)]
+    assert all(reply.content["status"] == "completed" for reply in replies)
+    # One worker, yet all four reviews shared a batch
+    assert [len(requests) for requests in batches.created] == [4]
+
+
+@pytest.mark.parametrize("stage,batched", [("development", True), ("security", True), ("architecture", False)])
+def test_stage_timeouts_allow_for_batches(tmp_path, stage, batched):
+    memory = SharedKnowledgeBase(tmp_path)
+    coordinator = CoordinatorAgent(make_transport(FakeBatches()), MessageRouter(AgentRole), memory)
+    expected = coordinator.BATCH_STAGE_TIMEOUT if batched else coordinator.STAGE_TIMEOUT
+    assert coordinator.stage_timeout(stage) == expected
+
+    coordinator.transport.batcher = None
+    assert coordinator.stage_timeout(stage) == coordinator.STAGE_TIMEOUT
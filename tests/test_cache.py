@@ -0,0 +1,72 @@
+"""Tests for the model response cache."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_agent_cli import cache as cache_module
+from ai_agent_cli.cache import ResponseCache
+
+
+def test_memory_entries_expire(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=0.05)
+
+    async def run():
+        key = cache.make_key("model", "prompt", 10)
+        await cache.put(key, "response")
+        assert await cache.get(key) == "response"
+        time.sleep(0.1)
+        assert await cache.get(key) is None
+
+    asyncio.run(run())
+    assert cache.stats["memory_hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_disk_hits_survive_a_new_instance(tmp_path):
+    key = ResponseCache.make_key("model", "prompt", 10)
+    asyncio.run(ResponseCache(tmp_path).put(key, "response"))
+
+    cache = ResponseCache(tmp_path)
+    assert asyncio.run(cache.get(key)) == "response"
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_concurrent_disk_writes_keep_size_accounting(tmp_path):
+    cache = ResponseCache(tmp_path, max_disk_bytes=10 * 1024 * 1024)
+    keys = [cache.make_key("model", str(index), 10) for index in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda key: cache._write_disk(key, "x" * 100), keys + keys[:50]))
+
+    on_disk = sum(path.stat().st_size for path in tmp_path.glob("*/*.json"))
+    assert len(list(tmp_path.glob("*/*.json"))) == 200
+    assert not list(tmp_path.glob("*/*.tmp"))
+    assert cache._disk_bytes == on_disk
+
+
+def test_overwrites_do_not_inflate_size_accounting(tmp_path):
+    cache = ResponseCache(tmp_path, max_disk_bytes=1024)
+    evictions = []
+    evict = cache._evict
+    cache._evict = lambda: evictions.append(1) or evict()
+    key = cache.make_key("model", "prompt", 10)
+    cache._write_disk(cache.make_key("model", "other", 10), "x" * 300)
+    for _ in range(20):
+        cache._write_disk(key, "y" * 300)
+
+    # Two entries fit in the limit, so overwriting one never needs eviction
+    assert evictions == []
+    assert cache._disk_bytes == sum(path.stat().st_size for path in tmp_path.glob("*/*.json"))
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path)
+    key = cache.make_key("model", "prompt", 10)
+
+    def fail(source, dest):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cache_module.os, "replace", fail)
+    cache._write_disk(key, "response")
+
+    assert not list(tmp_path.glob("*/*"))
@@ -0,0 +1,74 @@
+"""Tests for token-budgeted prompt context."""
+
+import asyncio
+
+from ai_agent_cli.context import ContextBuilder, Section, approx_tokens
+from ai_agent_cli.multi_agent.agents import CoordinatorAgent
+from ai_agent_cli.multi_agent.core import AgentRole, MessageRouter
+from ai_agent_cli.multi_agent.memory import SharedKnowledgeBase
+
+
+class FakeTransport:
+    def __init__(self):
+        self.calls = 0
+
+    async def complete(self, prompt, **params):
+        self.calls += 1
+        return "summary " * 40
+
+
+def test_sections_fit_the_budget():
+    builder = ContextBuilder(budget=200)
+    text = asyncio.run(builder.build([
+        Section("Important", "a" * 200, priority=2),
+        Section("Bulk", "b" * 4000, priority=0)
+    ]))
+    assert approx_tokens(text) <= 200
+    assert "a" * 200 in text
+
+
+def test_summaries_are_reused_when_the_allowance_changes():
+    transport = FakeTransport()
+    builder = ContextBuilder(budget=400, transport=transport)
+
+    async def run():
+        for size in (100, 300, 500, 200):
+            text = await builder.build([
+                Section("State", "s" * size, priority=2),
+                Section("History", "h" * 4000, priority=0)
+            ])
+            assert approx_tokens(text) <= 400
+
+    asyncio.run(run())
+    assert transport.calls == 1
+
+
+def test_coordinator_call_stays_within_one_budget(tmp_path):
+    async def run():
+        memory = SharedKnowledgeBase(tmp_path)
+        coordinator = CoordinatorAgent(
+            None,
+            MessageRouter(AgentRole),
+            memory,
+            context_builder=ContextBuilder(budget=1000)
+        )
+        await memory.store("latest_trends", {
+            "timestamp": "2024-01-01T00:00:00",
+            "analysis": "analysis " * 800,
+            "trends": [{"name": f"repo-{index}", "description": "x" * 200} for index in range(40)]
+        })
+        for index in range(10):
+            coordinator.finished_projects[f"project-{index}"] = {"name": f"P{index}", "notes": "n" * 2000}
+
+        template = "Given the current system state:\n{context}\n\nAnalyze it."
+        prompt, research = await coordinator.fit_call(template, coordinator.state_sections())
+        assert approx_tokens(prompt) + approx_tokens(coordinator.system_prompt(research)) <= 1000
+        assert "Agent Status" in prompt
+
+        # The system block does not depend on the state in the prompt
+        coordinator.finished_projects.clear()
+        _, unchanged = await coordinator.fit_call(template, coordinator.state_sections())
+        assert unchanged == research
+        await memory.aclose()
+
+    asyncio.run(run())
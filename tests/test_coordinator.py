@@ -0,0 +1,98 @@
+"""Tests for the coordinator's project bookkeeping."""
+
+import asyncio
+import time
+
+from ai_agent_cli.multi_agent.agents import CoordinatorAgent
+from ai_agent_cli.multi_agent.core import AgentRole, Message, MessageRouter
+from ai_agent_cli.multi_agent.memory import SharedKnowledgeBase
+
+
+def make_coordinator(tmp_path):
+    memory = SharedKnowledgeBase(tmp_path)
+    return CoordinatorAgent(None, MessageRouter(AgentRole), memory)
+
+
+def research_reply(*names):
+    return Message(
+        from_role=AgentRole.RESEARCHER,
+        to_role=AgentRole.COORDINATOR,
+        content={
+            "status": "completed",
+            "trends": {"project_suggestions": [{"name": name} for name in names]}
+        }
+    )
+
+
+def test_duplicate_suggestions_are_skipped(tmp_path):
+    async def run():
+        coordinator = make_coordinator(tmp_path)
+        await coordinator.shared_memory.store("project:project-0", {"name": "Stored"})
+        await coordinator.handle_message(research_reply("Alpha", "Beta", " alpha "))
+        await coordinator.handle_message(research_reply("Alpha", "Gamma", "stored"))
+        names = sorted(project["name"] for project in coordinator.active_projects.values())
+        assert names == ["Alpha", "Beta", "Gamma"]
+        assert coordinator.project_queue.qsize() == 3
+        await coordinator.shared_memory.aclose()
+
+    asyncio.run(run())
+
+
+def test_finished_projects_are_archived_and_bounded(tmp_path):
+    async def run():
+        coordinator = make_coordinator(tmp_path)
+        total = coordinator.MAX_FINISHED_PROJECTS + 5
+        project_ids = [coordinator.submit_project({"name": f"P{index}"}) for index in range(total)]
+        for project_id in project_ids:
+            coordinator.active_projects[project_id]["status"] = "failed"
+            coordinator._archive_project(project_id)
+
+        assert not coordinator.projects_in_progress
+        assert len(coordinator.finished_projects) == coordinator.MAX_FINISHED_PROJECTS
+        # Archived projects still count as known
+        assert coordinator.submit_project({"name": f"P{total - 1}"}) is None
+        await coordinator.shared_memory.aclose()
+
+    asyncio.run(run())
+
+
+def test_research_waits_for_interval(tmp_path):
+    async def run():
+        coordinator = make_coordinator(tmp_path)
+        assert coordinator.research_due
+        await coordinator.handle_message(research_reply())
+        assert not coordinator.research_due
+        coordinator.research_completed_at -= coordinator.RESEARCH_INTERVAL
+        assert coordinator.research_due
+        await coordinator.shared_memory.aclose()
+
+    asyncio.run(run())
+
+
+def test_only_watched_memory_keys_wake_the_coordinator(tmp_path):
+    async def run():
+        coordinator = make_coordinator(tmp_path)
+        await coordinator.shared_memory.store("project:project-1", {"name": "Own"})
+        await coordinator.shared_memory.store("notes", "unrelated")
+        assert not coordinator.wakeup.is_set()
+        await coordinator.shared_memory.store("latest_trends", {"trends": []})
+        assert coordinator.wakeup.is_set()
+        await coordinator.shared_memory.aclose()
+
+    asyncio.run(run())
+
+
+def test_wakeups_are_debounced(tmp_path):
+    async def run():
+        coordinator = make_coordinator(tmp_path)
+        coordinator.MIN_REPLAN_INTERVAL = 0.2
+        coordinator._planned_at = time.monotonic()
+        for _ in range(5):
+            coordinator.notify()
+        start = time.monotonic()
+        await coordinator.wait_for_event()
+        assert time.monotonic() - start >= 0.15
+        assert not coordinator.wakeup.is_set()
+        await coordinator.shared_memory.aclose()
+
+    asyncio.run(run())
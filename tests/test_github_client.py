@@ -0,0 +1,262 @@
+"""Tests for the GitHub client against local stand-in REST and GraphQL servers."""
+
+import asyncio
+from types import SimpleNamespace
+
+from aiohttp import web
+
+from ai_agent_cli import utils
+from ai_agent_cli.github_client import GitHubClient
+from ai_agent_cli.http_cache import HTTPCache
+from ai_agent_cli.multi_agent.agents import ResearcherAgent
+from ai_agent_cli.multi_agent.core import AgentRole, MessageRouter
+
+
+def repository_node(name):
+    return {
+        "stargazerCount": 42,
+        "forkCount": 7,
+        "pushedAt": "2024-01-01T00:00:00Z",
+        "languages": {
+            "totalSize": 400,
+            "edges": [
+                {"size": 300, "node": {"name": "Python"}},
+                {"size": 100, "node": {"name": "Rust"}}
+            ]
+        },
+        "repositoryTopics": {"nodes": [{"topic": {"name": "cli"}}]},
+        "defaultBranchRef": {"target": {"history": {
+            "totalCount": 120,
+            "nodes": [{
+                "messageHeadline": f"Update {name}",
+                "committedDate": "2024-01-01T00:00:00Z",
+                "author": {"name": "Octo Cat", "user": {"login": "octocat"}}
+            }]
+        }}},
+        "openIssues": {"totalCount": 3},
+        "closedIssues": {"totalCount": 9},
+        "recentIssues": {"nodes": [{"title": "Bug", "state": "OPEN", "comments": {"totalCount": 2}}]}
+    }
+
+
+class FakeGraphQL:
+    """Answers repository alias queries; ``missing`` repos resolve to null."""
+
+    def __init__(self, missing=(), broken=()):
+        self.missing = set(missing)
+        self.broken = set(broken)
+        self.batches = []
+
+    def install(self, router):
+        router.add_post("/graphql", self.handle)
+
+    async def handle(self, request):
+        assert request.headers["Authorization"] == "Bearer token"
+        body = await request.json()
+        names = {
+            key[len("name"):]: value
+            for key, value in body["variables"].items()
+            if key.startswith("name")
+        }
+        self.batches.append(sorted(names.values()))
+        if self.broken & set(names.values()):
+            return web.json_response({"message": "Something went wrong"}, status=500)
+        data, errors = {}, []
+        for index, name in names.items():
+            if name in self.missing:
+                data[f"repo{index}"] = None
+                errors.append({"type": "NOT_FOUND", "path": [f"repo{index}"], "message": "not found"})
+            else:
+                data[f"repo{index}"] = repository_node(name)
+        return web.json_response({"data": data, "errors": errors})
+
+
+async def serve(fake):
+    app = web.Application()
+    fake.install(app.router)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+
+
+def run_against(fake, coroutine_factory, batch_size=3, cache_ttl=300):
+    async def run():
+        runner, url = await serve(fake)
+        github = GitHubClient("token", api_url=url, metadata_batch_size=batch_size, cache_ttl=cache_ttl)
+        try:
+            return await coroutine_factory(github)
+        finally:
+            await github.close()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+class FakeREST:
+    """Serves /user with an ETag and /rate_limit, counting requests."""
+
+    def __init__(self, failures=0, remaining=4999):
+        self.failures = failures
+        self.remaining = remaining
+        self.requests = []
+
+    def install(self, router):
+        router.add_get("/user", self.user)
+        router.add_get("/rate_limit", self.rate_limit)
+
+    def quota_headers(self):
+        return {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": "1700000000",
+            "X-RateLimit-Resource": "core"
+        }
+
+    async def user(self, request):
+        assert request.headers["Authorization"] == "Bearer token"
+        revalidated = request.headers.get("If-None-Match") == '"v1"'
+        self.requests.append("304" if revalidated else "200")
+        # Long enough for concurrent callers to pile up on one request
+        await asyncio.sleep(0.05)
+        if self.failures:
+            self.failures -= 1
+            return web.json_response({"message": "Bad credentials"}, status=401)
+        if revalidated:
+            return web.Response(status=304, headers=self.quota_headers())
+        return web.json_response(
+            {"login": "octocat"},
+            headers={"ETag": '"v1"', **self.quota_headers()}
+        )
+
+    async def rate_limit(self, request):
+        core = {"limit": 5000, "remaining": 4321, "reset": 1700000123}
+        # GitHub does not send core quota headers on /rate_limit itself
+        return web.json_response({"resources": {"core": core, "graphql": {"limit": 5000}}})
+
+
+def urls(*names):
+    return [f"https://github.com/owner/{name}" for name in names]
+
+
+def fake_scraper(scraped):
+    async def analyze_repository(url, session, cache=None):
+        scraped.append(url)
+        return {"url": url, "scraped": True}
+    return analyze_repository
+
+
+def test_metadata_matches_the_scraper_shape_and_is_batched():
+    fake = FakeGraphQL()
+    names = [f"r{index}" for index in range(7)]
+    results = run_against(fake, lambda github: github.repository_metadata(urls(*names)))
+
+    assert [len(batch) for batch in fake.batches] == [3, 3, 1]
+    analysis = results["https://github.com/owner/r0"]
+    assert set(analysis) == {"url", "name", "stars", "forks", "languages", "topics", "last_updated", "activity"}
+    assert analysis["name"] == "r0"
+    assert analysis["languages"] == {"Python": 75.0, "Rust": 25.0}
+    assert analysis["activity"]["commits"]["recent_commits"][0]["author"] == "octocat"
+    assert analysis["activity"]["commits"]["commit_count"] == 120
+    assert analysis["activity"]["issues"]["recent_issues"] == [{"title": "Bug", "state": "open", "comments": 2}]
+
+
+def test_partial_errors_fall_back_to_the_scraper(monkeypatch):
+    scraped = []
+    monkeypatch.setattr(utils, "analyze_repository", fake_scraper(scraped))
+    fake = FakeGraphQL(missing={"gone"})
+    repo_urls = urls("a", "gone", "b") + ["https://example.com/not-github"]
+
+    results = run_against(fake, lambda github: utils.analyze_repositories(repo_urls, github=github))
+
+    assert scraped == ["https://github.com/owner/gone", "https://example.com/not-github"]
+    assert [result["url"] for result in results] == repo_urls
+    assert results[0]["stars"] == 42
+    assert results[1]["scraped"]
+
+
+def test_failed_batch_falls_back_to_the_scraper(monkeypatch):
+    scraped = []
+    monkeypatch.setattr(utils, "analyze_repository", fake_scraper(scraped))
+    fake = FakeGraphQL(broken={"d"})
+    repo_urls = urls("a", "b", "c", "d", "e")
+
+    results = run_against(fake, lambda github: utils.analyze_repositories(repo_urls, github=github))
+
+    # The second batch (d, e) failed as a whole; the first was unaffected
+    assert scraped == urls("d", "e")
+    assert [result.get("stars") for result in results] == [42, 42, 42, None, None]
+
+
+def test_researcher_adds_metadata_to_trends(monkeypatch, tmp_path):
+    scraped = []
+    monkeypatch.setattr(utils, "analyze_repository", fake_scraper(scraped))
+    fake = FakeGraphQL(missing={"gone"})
+    trends = [{"url": url, "name": url.rsplit("/", 1)[1], "stars": "1,000"} for url in urls("a", "gone")]
+
+    async def enrich(github):
+        researcher = ResearcherAgent(
+            None, MessageRouter(AgentRole), None, github=github, http_cache=HTTPCache(tmp_path)
+        )
+        return await researcher.add_metadata(SimpleNamespace(), trends)
+
+    enriched = run_against(fake, enrich)
+    assert enriched[0]["stars"] == 42
+    assert enriched[0]["languages"] == {"Python": 75.0, "Rust": 25.0}
+    assert enriched[0]["commit_count"] == 120
+    assert scraped == urls("gone")
+
+
+def test_concurrent_lookups_share_one_request():
+    fake = FakeREST()
+
+    async def lookups(github):
+        return await asyncio.gather(*(github.get_user() for _ in range(5)), github.login())
+
+    results = run_against(fake, lookups)
+    assert results[:5] == [{"login": "octocat"}] * 5 and results[5] == "octocat"
+    assert fake.requests == ["200"]
+
+
+def test_expired_lookup_is_revalidated_with_its_etag():
+    fake = FakeREST()
+
+    async def lookups(github):
+        first = await github.get_user()
+        await asyncio.sleep(0.1)
+        return first, await github.get_user()
+
+    first, second = run_against(fake, lookups, cache_ttl=0.05)
+    assert first == second == {"login": "octocat"}
+    assert fake.requests == ["200", "304"]
+
+
+def test_failed_lookups_are_not_cached():
+    fake = FakeREST(failures=1)
+
+    async def lookups(github):
+        try:
+            await github.verify()
+        except ValueError as e:
+            error = str(e)
+        return error, await github.get_user()
+
+    error, user = run_against(fake, lookups)
+    assert "401" in error
+    assert user == {"login": "octocat"}
+    assert fake.requests == ["200", "200"]
+
+
+def test_quota_is_tracked_from_headers_and_refreshed():
+    fake = FakeREST(remaining=100)
+
+    async def check(github):
+        await github.get_user()
+        tracked = dict(github.rate_limit)
+        return tracked, await github.quota()
+
+    tracked, refreshed = run_against(fake, check)
+    assert tracked == {"limit": 5000, "remaining": 100, "reset": 1700000000}
+    assert refreshed == {"limit": 5000, "remaining": 4321, "reset": 1700000123}
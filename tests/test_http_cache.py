@@ -0,0 +1,100 @@
+"""Tests for the on-disk HTTP page cache against a local aiohttp stand-in."""
+
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from ai_agent_cli.http_cache import HTTPCache
+
+
+class FakeGitHub:
+    """Serves ``/<name>`` pages of 100 bytes with an ETag per page."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def handle(self, request):
+        name = request.match_info["name"]
+        etag = f'"{name}-v1"'
+        if request.headers.get("If-None-Match") == etag:
+            self.requests.append((name, 304))
+            return web.Response(status=304, headers={"ETag": etag})
+        self.requests.append((name, 200))
+        return web.Response(text=name[0] * 100, headers={"ETag": etag})
+
+
+def run_with_server(fake, scenario):
+    async def run():
+        app = web.Application()
+        app.router.add_get("/{name}", fake.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await scenario(session, f"http://{host}:{port}")
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def test_fresh_entries_are_served_without_a_request(tmp_path):
+    fake = FakeGitHub()
+    cache = HTTPCache(tmp_path, max_age=300)
+
+    async def scenario(session, base):
+        return [await cache.fetch(session, f"{base}/alpha") for _ in range(3)]
+
+    assert run_with_server(fake, scenario) == ["a" * 100] * 3
+    assert fake.requests == [("alpha", 200)]
+    assert cache.stats == {"fresh": 2, "revalidated": 0, "fetched": 1}
+
+
+def test_stale_entries_are_revalidated_with_their_etag(tmp_path):
+    fake = FakeGitHub()
+    cache = HTTPCache(tmp_path, max_age=0)
+
+    async def scenario(session, base):
+        return [await cache.fetch(session, f"{base}/alpha") for _ in range(2)]
+
+    assert run_with_server(fake, scenario) == ["a" * 100] * 2
+    assert fake.requests == [("alpha", 200), ("alpha", 304)]
+    assert cache.stats["revalidated"] == 1
+
+    # The index survives a restart
+    assert HTTPCache(tmp_path).index.keys() == cache.index.keys()
+
+
+def test_missing_body_after_304_is_fetched_again(tmp_path):
+    fake = FakeGitHub()
+    cache = HTTPCache(tmp_path, max_age=0)
+
+    async def scenario(session, base):
+        url = f"{base}/alpha"
+        await cache.fetch(session, url)
+        cache._body_path(url).unlink()
+        return await cache.fetch(session, url)
+
+    assert run_with_server(fake, scenario) == "a" * 100
+    assert fake.requests == [("alpha", 200), ("alpha", 304), ("alpha", 200)]
+
+
+def test_least_recently_used_bodies_are_evicted(tmp_path):
+    fake = FakeGitHub()
+    cache = HTTPCache(tmp_path, max_age=300, max_bytes=250)
+
+    async def scenario(session, base):
+        await cache.fetch(session, f"{base}/alpha")
+        await cache.fetch(session, f"{base}/bravo")
+        await cache.fetch(session, f"{base}/alpha")
+        await cache.fetch(session, f"{base}/charlie")
+        return base
+
+    base = run_with_server(fake, scenario)
+    assert sorted(cache.index) == [f"{base}/alpha", f"{base}/charlie"]
+    assert not cache._body_path(f"{base}/bravo").exists()
+    assert len(list(tmp_path.glob("*.html"))) == 2
@@ -0,0 +1,17 @@
+"""Import-time regression guard for the CLI entry point."""
+
+import subprocess
+import sys
+
+HEAVY_MODULES = ("anthropic", "github", "bs4", "aiohttp")
+
+
+def test_agent_import_skips_heavy_dependencies():
+    code = (
+        "import sys, ai_agent_cli.agent\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
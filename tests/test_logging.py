@@ -0,0 +1,85 @@
+"""Tests for queued logging with rotating file output."""
+
+import gzip
+import io
+import logging
+
+import pytest
+from rich.console import Console
+
+from ai_agent_cli import utils
+
+
+@pytest.fixture
+def restore_logging(monkeypatch):
+    monkeypatch.setattr(utils, "console", Console(file=io.StringIO(), width=200))
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield utils.console.file
+    utils._stop_log_listener()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_exceptions_reach_the_console_with_their_traceback(tmp_path, restore_logging):
+    logger = utils.setup_logging(tmp_path / "ai_agent.log")
+    try:
+        raise RuntimeError("disk on fire")
+    except RuntimeError:
+        logger.exception("step failed")
+    utils._stop_log_listener()
+
+    output = restore_logging.getvalue()
+    assert "step failed" in output and "disk on fire" in output
+    # Rendered by Rich in a panel, not pre-formatted into the message
+    assert "╭" in output and "Traceback (most recent call last):" not in output
+    log = (tmp_path / "ai_agent.log").read_text()
+    assert "Traceback (most recent call last)" in log and "RuntimeError: disk on fire" in log
+
+
+def test_messages_keep_their_logged_arguments(tmp_path, restore_logging):
+    logger = utils.setup_logging(tmp_path / "ai_agent.log")
+    steps = ["design"]
+    logger.info("steps: %s", steps)
+    steps.append("build")
+    utils._stop_log_listener()
+
+    assert "steps: ['design']" in (tmp_path / "ai_agent.log").read_text()
+
+
+def test_backups_are_rotated_into_gzip_files(tmp_path, restore_logging):
+    logger = utils.setup_logging(
+        tmp_path / "ai_agent.log",
+        max_size=500,
+        backup_count=2,
+        compress_backups=True
+    )
+    for index in range(40):
+        logger.info(f"entry {index:03d} " + "x" * 40)
+    utils._stop_log_listener()
+
+    assert (tmp_path / "ai_agent.log.1.gz").exists()
+    assert (tmp_path / "ai_agent.log.2.gz").exists()
+    assert not (tmp_path / "ai_agent.log.3.gz").exists()
+    assert not (tmp_path / "ai_agent.log.1").exists()
+    with gzip.open(tmp_path / "ai_agent.log.1.gz", "rt") as f:
+        assert "entry" in f.read()
+    assert "entry 039" in (tmp_path / "ai_agent.log").read_text()
+
+
+def test_setup_again_replaces_the_listener(tmp_path, restore_logging):
+    utils.setup_logging(tmp_path / "first.log")
+    first = utils._log_listener
+    logger = utils.setup_logging(tmp_path / "second.log")
+
+    root = logging.getLogger()
+    assert len(root.handlers) == 1
+    assert utils._log_listener is not first and first._thread is None
+
+    logger.info("only once")
+    utils._stop_log_listener()
+    assert (tmp_path / "second.log").read_text().count("only once") == 1
+    assert "only once" not in (tmp_path / "first.log").read_text()
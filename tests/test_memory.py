@@ -0,0 +1,152 @@
+"""Tests for the shared knowledge base and its reader-writer lock."""
+
+import asyncio
+
+from ai_agent_cli.multi_agent.memory import ReadWriteLock, SharedKnowledgeBase
+from ai_agent_cli.multi_agent.storage import StorageBackend
+
+
+class CountingBackend(StorageBackend):
+    """Records each batch of operations handed to the backend."""
+
+    def __init__(self):
+        self.writes = []
+        self.closed = False
+
+    def load(self):
+        return {}
+
+    async def write(self, ops, snapshot=None):
+        self.writes.append(list(ops))
+
+    async def close(self):
+        self.closed = True
+
+
+class Tracker:
+    """Log lock holders so overlap can be checked afterwards."""
+
+    def __init__(self):
+        self.events = []
+        self.active = set()
+        self.overlaps = []
+
+    async def hold(self, lock, name, kind, seconds=0.02):
+        async with getattr(lock, kind)():
+            self.overlaps.append((name, set(self.active)))
+            self.active.add(name)
+            self.events.append(name)
+            await asyncio.sleep(seconds)
+            self.active.discard(name)
+
+
+def test_readers_share_the_lock():
+    tracker = Tracker()
+
+    async def run():
+        lock = ReadWriteLock()
+        await asyncio.gather(*(tracker.hold(lock, f"r{index}", "reader") for index in range(3)))
+
+    asyncio.run(run())
+    # Every later reader found the earlier ones still holding the lock
+    assert tracker.overlaps[-1] == ("r2", {"r0", "r1"})
+
+
+def test_writer_excludes_readers_and_writers():
+    tracker = Tracker()
+
+    async def run():
+        lock = ReadWriteLock()
+        await asyncio.gather(
+            tracker.hold(lock, "w0", "writer"),
+            tracker.hold(lock, "r0", "reader"),
+            tracker.hold(lock, "w1", "writer"),
+            tracker.hold(lock, "r1", "reader")
+        )
+
+    asyncio.run(run())
+    for name, others in tracker.overlaps:
+        if name.startswith("w"):
+            assert others == set()
+        else:
+            assert not any(other.startswith("w") for other in others)
+
+
+def test_waiting_writer_is_not_starved_by_new_readers():
+    tracker = Tracker()
+
+    async def run():
+        lock = ReadWriteLock()
+        first = asyncio.ensure_future(tracker.hold(lock, "r0", "reader", seconds=0.05))
+        await asyncio.sleep(0.01)
+        writer = asyncio.ensure_future(tracker.hold(lock, "w", "writer"))
+        await asyncio.sleep(0.01)
+        # Readers keep arriving while the writer waits for r0 to finish
+        late = [
+            asyncio.ensure_future(tracker.hold(lock, f"r{index}", "reader"))
+            for index in range(1, 4)
+        ]
+        await asyncio.gather(first, writer, *late)
+
+    asyncio.run(run())
+    assert tracker.events[:2] == ["r0", "w"]
+
+
+def test_stores_within_the_interval_share_one_persist(tmp_path):
+    backend = CountingBackend()
+
+    async def run():
+        memory = SharedKnowledgeBase(tmp_path, backend=backend, flush_interval_ms=50)
+        for index in range(10):
+            await memory.store(f"key{index}", index)
+        assert backend.writes == []
+        await asyncio.sleep(0.1)
+        assert len(backend.writes) == 1
+        await memory.aclose()
+
+    asyncio.run(run())
+    assert [key for _, key, _ in backend.writes[0]] == [f"key{index}" for index in range(10)]
+
+
+def test_full_batches_persist_without_waiting(tmp_path):
+    backend = CountingBackend()
+
+    async def run():
+        memory = SharedKnowledgeBase(tmp_path, backend=backend, flush_interval_ms=60000, flush_max_writes=4)
+        for index in range(9):
+            await memory.store(f"key{index}", index)
+        assert [len(ops) for ops in backend.writes] == [4, 4]
+        await memory.flush()
+        assert [len(ops) for ops in backend.writes] == [4, 4, 1]
+        await memory.aclose()
+
+    asyncio.run(run())
+
+
+def test_aclose_writes_pending_operations(tmp_path):
+    backend = CountingBackend()
+
+    async def run():
+        memory = SharedKnowledgeBase(tmp_path, backend=backend, flush_interval_ms=60000)
+        await memory.store("kept", 1)
+        await memory.store("gone", 2)
+        await memory.delete("gone")
+        await memory.aclose()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert len(backend.writes) == 1
+    assert [(op, key) for op, key, _ in backend.writes[0]] == [("put", "kept"), ("put", "gone"), ("delete", "gone")]
+    assert backend.closed
+
+
+def test_without_an_interval_every_store_persists(tmp_path):
+    backend = CountingBackend()
+
+    async def run():
+        memory = SharedKnowledgeBase(tmp_path, backend=backend)
+        for index in range(3):
+            await memory.store(f"key{index}", index)
+        await memory.aclose()
+
+    asyncio.run(run())
+    assert [len(ops) for ops in backend.writes] == [1, 1, 1]
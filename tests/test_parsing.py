@@ -0,0 +1,58 @@
+"""Tests for GitHub page scraping over saved fixture pages."""
+
+from pathlib import Path
+
+import pytest
+
+from ai_agent_cli import utils
+from ai_agent_cli.utils import (
+    COMMIT_STRAINER,
+    ISSUE_STRAINER,
+    TRENDING_STRAINER,
+    analyze_commit_activity,
+    analyze_issue_activity,
+    extract_trending,
+    make_soup,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "github"
+
+STRAINED_PAGES = [
+    ("commits.html", COMMIT_STRAINER, analyze_commit_activity),
+    ("issues.html", ISSUE_STRAINER, analyze_issue_activity),
+    ("trending.html", TRENDING_STRAINER, extract_trending),
+]
+
+
+def read(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("name,strainer,extract", STRAINED_PAGES)
+def test_strained_and_full_parses_agree(name, strainer, extract):
+    html = read(name)
+    strained = extract(make_soup(html, strainer))
+    assert strained == extract(make_soup(html))
+    assert strained
+
+
+def test_fixture_results():
+    commits = analyze_commit_activity(make_soup(read("commits.html"), COMMIT_STRAINER))
+    assert commits["commit_count"] == 35
+    assert len(commits["recent_commits"]) == 10
+    assert commits["recent_commits"][0]["author"] == "dev0"
+
+    issues = analyze_issue_activity(make_soup(read("issues.html"), ISSUE_STRAINER))
+    assert issues["open_issues"] + issues["closed_issues"] == 25
+    assert len(issues["recent_issues"]) == 5
+
+    trending = extract_trending(make_soup(read("trending.html"), TRENDING_STRAINER))
+    assert len(trending) == 25
+    assert trending[0]["url"] == "https://github.com/org0/project0"
+
+    repository = make_soup(read("repository.html"))
+    assert utils.extract_stars(repository) == 12345
+    assert utils.extract_forks(repository) == 1678
+    assert utils.extract_languages(repository)["Python"] == 61.4
+    assert "cli" in utils.extract_topics(repository)
+    assert utils.extract_last_updated(repository) == "2024-06-01T12:34:56Z"
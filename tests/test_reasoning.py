@@ -0,0 +1,68 @@
+"""Tests for the reasoning engine's thought journal and context file."""
+
+import json
+
+from ai_agent_cli.reasoning import RECENT_THOUGHTS, ReasoningEngine, Thought, _tail_lines
+
+
+def thought(index):
+    return Thought(content=f"thought {index} " + "x" * 30, timestamp=f"t{index}", context={"index": index})
+
+
+def test_tail_lines_across_block_boundaries(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    lines = [f"line {index} " + "y" * (index % 7 * 5) for index in range(40)]
+    path.write_text("\n".join(lines) + "\n\n")
+
+    for block_size in (1, 7, 16, 64, 8192):
+        for count in (1, 5, 39, 40, 100):
+            assert _tail_lines(path, count, block_size=block_size) == lines[-count:]
+    assert _tail_lines(path, 0) == []
+    assert _tail_lines(tmp_path / "missing.jsonl", 5) == []
+
+
+def test_recent_thoughts_beyond_the_memory_window(tmp_path):
+    engine = ReasoningEngine(None, tmp_path)
+    for index in range(RECENT_THOUGHTS + 10):
+        engine.record_thought(thought(index))
+
+    recent = engine.recent_thoughts(RECENT_THOUGHTS + 5)
+    assert [t.timestamp for t in recent] == [f"t{index}" for index in range(5, RECENT_THOUGHTS + 10)]
+
+    reloaded = ReasoningEngine(None, tmp_path)
+    assert [t.timestamp for t in reloaded.recent_thoughts(3)] == [f"t{index}" for index in range(57, 60)]
+
+
+def test_truncated_final_thought_is_dropped(tmp_path):
+    engine = ReasoningEngine(None, tmp_path)
+    for index in range(3):
+        engine.record_thought(thought(index))
+    journal = tmp_path / "thoughts.jsonl"
+    with open(journal, "a") as f:
+        f.write('{"content": "half writ')
+
+    reloaded = ReasoningEngine(None, tmp_path)
+    assert [t.timestamp for t in reloaded.recent_thoughts(5)] == ["t0", "t1", "t2"]
+    reloaded.record_thought(thought(3))
+
+    records = [json.loads(line) for line in journal.read_text().splitlines()]
+    assert [record["timestamp"] for record in records] == ["t0", "t1", "t2", "t3"]
+    assert [t.timestamp for t in ReasoningEngine(None, tmp_path).recent_thoughts(5)] == ["t0", "t1", "t2", "t3"]
+
+
+def test_save_memory_skips_unchanged_context(tmp_path):
+    engine = ReasoningEngine(None, tmp_path)
+    engine.save_memory()
+    assert not engine.context_file.exists()
+
+    engine.context["goal"] = "ship"
+    engine.save_memory()
+    assert json.loads(engine.context_file.read_text()) == {"goal": "ship"}
+
+    engine.context_file.unlink()
+    engine.save_memory()
+    assert not engine.context_file.exists()
+
+    reloaded = ReasoningEngine(None, tmp_path)
+    reloaded.save_memory()
+    assert not reloaded.context_file.exists()
@@ -0,0 +1,127 @@
+"""Tests for local vector retrieval over thoughts and shared knowledge."""
+
+import asyncio
+import json
+
+import numpy as np
+
+from ai_agent_cli.multi_agent.memory import SharedKnowledgeBase
+from ai_agent_cli.reasoning import ReasoningEngine
+from ai_agent_cli.retrieval import HashingVectorizer, KnowledgeIndex, ThoughtIndex, VectorIndex
+
+
+class FakeTransport:
+    def __init__(self):
+        self.prompts = []
+
+    async def complete(self, prompt, *args, **params):
+        self.prompts.append(prompt)
+        return "plan"
+
+
+def journal_line(content):
+    return (json.dumps({"content": content, "timestamp": "t", "context": {}}) + "\n").encode("utf-8")
+
+
+def test_vectors_are_unit_length_and_stable():
+    vectorizer = HashingVectorizer(dim=256)
+    vector = vectorizer.transform("rust command line tool")
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    assert np.array_equal(vector, HashingVectorizer(dim=256).transform("rust command line tool"))
+    assert not vectorizer.transform("").any()
+
+
+def test_search_ranks_by_similarity():
+    index = VectorIndex()
+    index.add("cli", "rust command line tool for parsing logs")
+    index.add("web", "react dashboard for web analytics")
+    index.add("ml", "machine learning model training pipeline")
+
+    results = index.search("command line log parser in rust", k=2, min_score=-1.0)
+    assert len(results) == 2 and results[0][0] == "cli"
+    assert results[0][1] > results[1][1]
+    # Unrelated documents fall below the default threshold
+    assert [key for key, _ in index.search("command line log parser in rust")] == ["cli"]
+    assert index.search("command line", k=3, min_score=0.99) == []
+
+
+def test_remove_keeps_remaining_rows_searchable():
+    index = VectorIndex()
+    for key in ("a", "b", "c"):
+        index.add(key, f"topic {key} {key} {key}")
+    index.remove("a")
+
+    assert len(index) == 2 and "a" not in index
+    assert index.search("topic c c c", k=1)[0][0] == "c"
+    assert index.search("topic b b b", k=1)[0][0] == "b"
+
+
+def test_thought_index_reloads_and_catches_up(tmp_path):
+    journal = tmp_path / "thoughts.jsonl"
+    index = ThoughtIndex(journal)
+    offset = 0
+    for content in ("design the storage layer", "write the http cache"):
+        line = journal_line(content)
+        with open(journal, "ab") as f:
+            f.write(line)
+        index.append(offset, content)
+        offset += len(line)
+    # Journaled after the index files were last written
+    with open(journal, "ab") as f:
+        f.write(journal_line("benchmark the parser"))
+
+    reloaded = ThoughtIndex(journal)
+    assert reloaded.keys == [0, len(journal_line("design the storage layer")), offset]
+    assert np.allclose(reloaded.vectors[:2], index.vectors)
+    assert reloaded.read(reloaded.search("parser benchmark", k=1)[0][0])["content"] == "benchmark the parser"
+    # Lines indexed while catching up are appended to the index files too
+    assert (tmp_path / "thoughts.jsonl.offsets").stat().st_size == 3 * 8
+
+
+def test_thought_index_rebuilds_after_journal_replaced(tmp_path):
+    journal = tmp_path / "thoughts.jsonl"
+    journal.write_bytes(journal_line("first entry about storage") + journal_line("second entry"))
+    ThoughtIndex(journal)
+    journal.write_bytes(journal_line("fresh"))
+
+    reloaded = ThoughtIndex(journal)
+    assert reloaded.keys == [0]
+
+
+def test_knowledge_index_follows_memory_changes(tmp_path):
+    async def run():
+        memory = SharedKnowledgeBase(tmp_path)
+        await memory.store("project:1", {"name": "log parser", "language": "rust"})
+        index = KnowledgeIndex(memory)
+        assert "project:1" in index
+
+        await memory.store("project:2", {"name": "analytics dashboard", "language": "typescript"})
+        assert index.lookup("typescript dashboard", k=1) == [
+            ("project:2", {"name": "analytics dashboard", "language": "typescript"})
+        ]
+
+        await memory.delete("project:2")
+        assert "project:2" not in index
+        assert [key for key, _ in index.lookup("rust log parser", k=5)] == ["project:1"]
+        await memory.aclose()
+
+    asyncio.run(run())
+
+
+def test_plans_include_relevant_knowledge(tmp_path):
+    async def run():
+        memory = SharedKnowledgeBase(tmp_path / "knowledge")
+        await memory.store("project:1", {"name": "rust log parser"})
+        await memory.store("project:2", {"name": "solidity token audit"})
+        transport = FakeTransport()
+        engine = ReasoningEngine(transport, tmp_path / "memory")
+        engine.attach_knowledge(memory)
+
+        await engine.reason_about_task("Build a log parser", {"language": "rust"})
+        await memory.aclose()
+        return transport.prompts[0]
+
+    prompt = asyncio.run(run())
+    knowledge = prompt.split("Relevant Knowledge:")[1].split("Please analyze")[0]
+    assert "rust log parser" in knowledge
+    assert "solidity" not in knowledge
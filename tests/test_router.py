@@ -0,0 +1,66 @@
+"""Tests for per-role priority mailboxes."""
+
+import asyncio
+
+import pytest
+
+from ai_agent_cli.multi_agent.core import AgentRole, Message, MessageRouter
+
+
+def message(task, priority=1, to_role=AgentRole.DEVELOPER):
+    return Message(
+        from_role=AgentRole.COORDINATOR,
+        to_role=to_role,
+        content={"task": task},
+        priority=priority
+    )
+
+
+def test_higher_priority_is_delivered_first_and_ties_keep_order():
+    router = MessageRouter(AgentRole)
+
+    async def run():
+        for task, priority in (("low-1", 1), ("high-1", 5), ("low-2", 1), ("mid", 3), ("high-2", 5)):
+            await router.send(message(task, priority))
+        return [(await router.receive(AgentRole.DEVELOPER)).content["task"] for _ in range(5)]
+
+    assert asyncio.run(run()) == ["high-1", "high-2", "mid", "low-1", "low-2"]
+
+
+def test_mailboxes_are_separate_per_role():
+    router = MessageRouter(AgentRole)
+
+    async def run():
+        await router.send(message("review", to_role=AgentRole.REVIEWER))
+        await router.send(message("build"))
+        return (
+            (await router.receive(AgentRole.REVIEWER)).content["task"],
+            router.pending(AgentRole.DEVELOPER)
+        )
+
+    assert asyncio.run(run()) == ("review", 1)
+
+
+def test_send_waits_while_the_mailbox_is_full():
+    router = MessageRouter(AgentRole, mailbox_size=2)
+
+    async def run():
+        await router.send(message("first"))
+        await router.send(message("second"))
+        blocked = asyncio.ensure_future(router.send(message("third", priority=9)))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+        assert router.pending(AgentRole.DEVELOPER) == 2
+
+        assert (await router.receive(AgentRole.DEVELOPER)).content["task"] == "first"
+        await asyncio.wait_for(blocked, timeout=1)
+        return [(await router.receive(AgentRole.DEVELOPER)).content["task"] for _ in range(2)]
+
+    assert asyncio.run(run()) == ["third", "second"]
+
+
+def test_unknown_role_is_rejected():
+    router = MessageRouter([AgentRole.DEVELOPER])
+
+    with pytest.raises(ValueError):
+        asyncio.run(router.send(message("design", to_role=AgentRole.ARCHITECT)))
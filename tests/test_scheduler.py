@@ -0,0 +1,154 @@
+"""Tests for dependency-aware plan execution and plan parsing."""
+
+import asyncio
+import json
+import time
+
+from ai_agent_cli.reasoning import Plan, ReasoningEngine
+from ai_agent_cli.scheduler import PlanScheduler
+
+STEP_SECONDS = 0.05
+
+
+class FakeSteps:
+    """Record when steps start and finish; fail the ids listed in ``failing``."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.events = []
+        self.running = 0
+        self.peak = 0
+
+    async def run(self, step):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.events.append(("start", step["id"]))
+        try:
+            await asyncio.sleep(STEP_SECONDS)
+            if step["id"] in self.failing:
+                raise RuntimeError(f"step {step['id']} failed")
+        finally:
+            self.running -= 1
+            self.events.append(("end", step["id"]))
+
+    def started(self):
+        return [step for event, step in self.events if event == "start"]
+
+
+def fan_out_plan():
+    """a, then b/c/d in parallel, then e once all three are done"""
+    return Plan(goal="ship", current_step=0, context={}, steps=[
+        {"id": "a", "type": "analyze_trends", "depends_on": []},
+        {"id": "b", "type": "generate_project", "depends_on": ["a"]},
+        {"id": "c", "type": "generate_project", "depends_on": ["a"]},
+        {"id": "d", "type": "generate_project", "depends_on": ["a"]},
+        {"id": "e", "type": "generate_project", "depends_on": ["b", "c", "d"]},
+    ])
+
+
+async def no_adapt(plan, information):
+    raise AssertionError(f"unexpected adaptation: {information}")
+
+
+def test_steps_start_after_their_dependencies():
+    steps = FakeSteps()
+    plan = asyncio.run(PlanScheduler(steps.run, no_adapt).run(fan_out_plan()))
+
+    assert plan.status == "completed"
+    assert plan.current_step == 5
+    position = {event: index for index, event in enumerate(steps.events)}
+    for before, after in (("a", "b"), ("a", "c"), ("a", "d"), ("b", "e"), ("c", "e"), ("d", "e")):
+        assert position[("end", before)] < position[("start", after)]
+
+
+def test_plan_finishes_in_critical_path_time():
+    steps = FakeSteps()
+    started = time.monotonic()
+    asyncio.run(PlanScheduler(steps.run, no_adapt, max_concurrency=3).run(fan_out_plan()))
+    elapsed = time.monotonic() - started
+
+    # a, then b/c/d together, then e: three steps on the critical path of five
+    assert steps.peak == 3
+    assert elapsed < 4 * STEP_SECONDS
+
+
+def test_concurrency_is_capped():
+    steps = FakeSteps()
+    plan = Plan(goal="ship", current_step=0, context={}, steps=[
+        {"id": str(index), "type": "generate_project", "depends_on": []}
+        for index in range(6)
+    ])
+    asyncio.run(PlanScheduler(steps.run, no_adapt, max_concurrency=2).run(plan))
+
+    assert steps.peak == 2
+    assert sorted(steps.started()) == [str(index) for index in range(6)]
+
+
+def test_steps_without_depends_on_run_in_sequence():
+    steps = FakeSteps()
+    plan = Plan(goal="ship", current_step=0, context={}, steps=[
+        {"id": "1", "type": "analyze_trends"},
+        {"id": "2", "type": "generate_project"},
+    ])
+    asyncio.run(PlanScheduler(steps.run, no_adapt).run(plan))
+
+    assert steps.events == [("start", "1"), ("end", "1"), ("start", "2"), ("end", "2")]
+
+
+def test_adapted_plan_skips_finished_steps():
+    steps = FakeSteps(failing={"b"})
+    adaptations = []
+
+    async def adapt(plan, information):
+        adaptations.append(information)
+        steps.failing.clear()
+        return Plan(goal=plan.goal, steps=plan.steps, current_step=0, context={})
+
+    plan = asyncio.run(PlanScheduler(steps.run, adapt).run(fan_out_plan()))
+
+    assert plan.status == "completed"
+    assert adaptations[0]["step"]["id"] == "b"
+    assert steps.started().count("a") == 1
+    assert steps.started().count("b") == 2
+
+
+def test_repeated_failures_stop_after_max_adaptations():
+    steps = FakeSteps(failing={"a"})
+    adaptations = []
+
+    async def adapt(plan, information):
+        adaptations.append(information)
+        return Plan(goal=plan.goal, steps=plan.steps, current_step=0, context={})
+
+    plan = asyncio.run(PlanScheduler(steps.run, adapt, max_adaptations=2).run(fan_out_plan()))
+
+    assert plan.status == "failed"
+    assert len(adaptations) == 2
+    assert steps.started() == ["a", "a", "a"]
+
+
+def test_plan_response_becomes_runnable_steps(tmp_path):
+    engine = ReasoningEngine(None, tmp_path)
+    response = "Here is the plan:\n```json\n" + json.dumps({
+        "goal": "Build a CLI",
+        "steps": [
+            {"id": 1, "type": "analyze_trends", "depends_on": []},
+            {"id": 2, "type": "implement_feature", "depends_on": [1], "file_path": "main.py"}
+        ]
+    }) + "\n```"
+
+    plan = Plan(**engine._parse_plan_response(response))
+    assert plan.status == "in_progress"
+    assert plan.goal == "Build a CLI"
+    assert [step["type"] for step in plan.steps] == ["analyze_trends", "implement_feature"]
+    assert all(step["parameters"] == {} for step in plan.steps)
+
+
+def test_unusable_plan_response_fails_without_running(tmp_path):
+    engine = ReasoningEngine(None, tmp_path)
+    steps = FakeSteps()
+    for response in ("no plan here", json.dumps({"goal": "x", "steps": [{"step": "Extracted step"}]})):
+        plan = Plan(**engine._parse_plan_response(response))
+        assert plan.status == "failed" and plan.steps == []
+        assert asyncio.run(PlanScheduler(steps.run, no_adapt).run(plan)).status == "failed"
+    assert steps.events == []
@@ -0,0 +1,209 @@
+"""Tests for the shared memory storage backends."""
+
+import asyncio
+import json
+import sqlite3
+import threading
+
+from ai_agent_cli.multi_agent.memory import SharedKnowledgeBase
+from ai_agent_cli.multi_agent.storage import LogStructuredBackend, SQLiteBackend
+
+
+def entry(value, persistent=True, timestamp="2024-01-01T00:00:00"):
+    return {"value": value, "timestamp": timestamp, "persistent": persistent}
+
+
+def restart(path):
+    backend = LogStructuredBackend(path)
+    return backend, backend.load()
+
+
+def test_legacy_migration_survives_restarts(tmp_path):
+    (tmp_path / "memory.json").write_text(json.dumps({"old": entry(1)}))
+
+    backend, state = restart(tmp_path)
+    assert list(state) == ["old"]
+    asyncio.run(backend.close())
+
+    backend, state = restart(tmp_path)
+    assert list(state) == ["old"]
+    asyncio.run(backend.write([("put", "new", entry(2))]))
+    asyncio.run(backend.close())
+
+    backend, state = restart(tmp_path)
+    assert sorted(state) == ["new", "old"]
+    asyncio.run(backend.close())
+
+
+def test_legacy_file_recovered_under_existing_log(tmp_path):
+    # Installs that already appended to a log without migrating the legacy file
+    (tmp_path / "memory.json").write_text(json.dumps({"old": entry(1), "gone": entry(0)}))
+    (tmp_path / "memory.log").write_text(
+        json.dumps({"op": "put", "key": "new", "entry": entry(2)}) + "\n"
+        + json.dumps({"op": "delete", "key": "gone"}) + "\n"
+    )
+
+    backend, state = restart(tmp_path)
+    assert sorted(state) == ["new", "old"]
+    asyncio.run(backend.close())
+
+    backend, state = restart(tmp_path)
+    assert sorted(state) == ["new", "old"]
+    assert (tmp_path / "snapshot.json").exists()
+    asyncio.run(backend.close())
+
+
+def test_torn_log_record_is_discarded(tmp_path):
+    (tmp_path / "memory.log").write_text(
+        json.dumps({"op": "put", "key": "a", "entry": entry(1)}) + "\n" + '{"op": "pu'
+    )
+    backend, state = restart(tmp_path)
+    assert list(state) == ["a"]
+    asyncio.run(backend.write([("put", "b", entry(2))]))
+    asyncio.run(backend.close())
+
+    backend, state = restart(tmp_path)
+    assert sorted(state) == ["a", "b"]
+    asyncio.run(backend.close())
+
+
+def test_log_appends_run_off_the_event_loop(tmp_path):
+    backend, _ = restart(tmp_path)
+    threads = []
+    append = backend._append
+    backend._append = lambda *args: threads.append(threading.current_thread().name) or append(*args)
+
+    async def run():
+        await backend.write([("put", "a", entry(1))])
+        await backend.close()
+
+    asyncio.run(run())
+    assert threads and threads[0].startswith("kb-log-write")
+    assert not hasattr(backend, "state")
+
+
+def test_compaction_writes_the_store_snapshot(tmp_path):
+    async def run():
+        memory = SharedKnowledgeBase(tmp_path, backend=LogStructuredBackend(tmp_path, compact_threshold=200))
+        for index in range(10):
+            await memory.store(f"key{index}", "v" * 50)
+        await memory.store("scratch", "temporary", persistent=False)
+        await memory.delete("key0")
+        await memory.aclose()
+
+    asyncio.run(run())
+    snapshot = json.loads((tmp_path / "snapshot.json").read_text())
+    assert "scratch" not in snapshot and "key1" in snapshot
+    assert not (tmp_path / "memory.log.compacting").exists()
+    # Compacted records are no longer in the live log
+    assert len((tmp_path / "memory.log").read_text().splitlines()) < 11
+
+    backend, state = restart(tmp_path)
+    assert sorted(state) == [f"key{index}" for index in range(1, 10)]
+    asyncio.run(backend.close())
+
+
+class NoFTS5Connection(sqlite3.Connection):
+    """A connection from an SQLite build without the FTS5 module."""
+
+    def executescript(self, script):
+        if "fts5" in script:
+            raise sqlite3.OperationalError("no such module: fts5")
+        return super().executescript(script)
+
+
+def open_sqlite(path, monkeypatch=None):
+    backend = SQLiteBackend(path)
+    if monkeypatch is not None:
+        connect = sqlite3.connect
+        monkeypatch.setattr(
+            sqlite3, "connect",
+            lambda *args, **kwargs: connect(*args, factory=NoFTS5Connection, **kwargs)
+        )
+    return backend, backend.load()
+
+
+KEYS = ("project:alpha", "project:beta", "trends:Latest", "ab")
+
+
+async def fill(backend):
+    await backend.write([
+        ("put", key, entry(key, timestamp=f"2024-01-0{index + 1}T00:00:00"))
+        for index, key in enumerate(KEYS)
+    ])
+
+
+def test_sqlite_runs_in_wal_mode(tmp_path):
+    backend, _ = open_sqlite(tmp_path)
+    assert backend._read_conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    asyncio.run(backend.close())
+
+
+def test_sqlite_drops_temporary_entries_on_load(tmp_path):
+    backend, _ = open_sqlite(tmp_path)
+
+    async def run():
+        await backend.write([("put", "kept", entry(1)), ("put", "scratch", entry(2, persistent=False))])
+        assert await backend.search("scratch") == {"scratch": 2}
+        await backend.close()
+
+    asyncio.run(run())
+    backend, state = open_sqlite(tmp_path)
+    assert list(state) == ["kept"]
+    asyncio.run(backend.close())
+
+
+def check_search(backend):
+    async def run():
+        await fill(backend)
+        results = (
+            await backend.search("OJEC"),
+            await backend.search("latest"),
+            await backend.search("b"),
+            await backend.search("project:", prefix=True),
+            await backend.search("zzz"),
+            await backend.recent(2)
+        )
+        await backend.write([("delete", "project:beta", None)])
+        results += (await backend.search("beta"),)
+        await backend.close()
+        return results
+
+    substring, mixed_case, short, prefix, missing, recent, deleted = asyncio.run(run())
+    assert sorted(substring) == ["project:alpha", "project:beta"]
+    assert list(mixed_case) == ["trends:Latest"]
+    assert sorted(short) == ["ab", "project:beta"]
+    assert sorted(prefix) == ["project:alpha", "project:beta"]
+    assert missing == {}
+    assert list(recent) == ["ab", "trends:Latest"]
+    assert deleted == {}
+
+
+def test_sqlite_search_uses_the_trigram_index(tmp_path):
+    backend, _ = open_sqlite(tmp_path)
+    assert backend.fts
+    check_search(backend)
+
+
+def test_sqlite_search_falls_back_without_fts5(tmp_path, monkeypatch):
+    backend, _ = open_sqlite(tmp_path, monkeypatch)
+    assert not backend.fts
+    check_search(backend)
+
+
+def test_sqlite_reads_and_writes_use_their_own_threads(tmp_path):
+    backend, _ = open_sqlite(tmp_path)
+    backend._read_conn.create_function("thread_name", 0, lambda: threading.current_thread().name)
+    writers = []
+    apply = backend._apply
+    backend._apply = lambda ops: writers.append(threading.current_thread().name) or apply(ops)
+
+    async def run():
+        await fill(backend)
+        rows = await backend._read("SELECT thread_name(), ''", ())
+        await backend.close()
+        return rows[0][0]
+
+    reader = asyncio.run(run())
+    assert writers[0].startswith("kb-sqlite-write")
+    assert reader.startswith("kb-sqlite-read")
@@ -0,0 +1,171 @@
+"""Tests for the shared LLM transport with fake slow clients."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from ai_agent_cli.rate_limit import RateLimiter, RetryableError
+from ai_agent_cli.transport import LLMTransport
+
+DELAY = 0.2
+CALLS = 5
+
+
+def text_message(text):
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=text)],
+        usage=SimpleNamespace(input_tokens=10, output_tokens=5)
+    )
+
+
+def prompt_of(params):
+    return params["messages"][0]["content"]
+
+
+class SyncClient:
+    """Blocking client, as the transport sees a plain ``Anthropic`` client."""
+
+    def __init__(self):
+        self.messages = SimpleNamespace(create=self.create)
+
+    def create(self, **params):
+        time.sleep(DELAY)
+        return text_message(f"sync:{prompt_of(params)}")
+
+
+class FakeStream:
+    def __init__(self, text):
+        self.text = text
+
+    async def __aenter__(self):
+        await asyncio.sleep(DELAY)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        for word in self.text.split(" "):
+            yield word + " "
+
+    async def get_final_message(self):
+        return text_message(self.text)
+
+
+class AsyncClient:
+    def __init__(self, streaming=True, failures=0):
+        self.failures = failures
+        self.active = 0
+        self.peak = 0
+        self.messages = SimpleNamespace(create=self.create)
+        if streaming:
+            self.messages.stream = self.stream
+
+    async def create(self, **params):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(DELAY)
+        self.active -= 1
+        return text_message(f"async:{prompt_of(params)}")
+
+    def stream(self, **params):
+        if self.failures:
+            self.failures -= 1
+            raise RetryableError("HTTP 529")
+        return FakeStream(f"streamed {prompt_of(params)}")
+
+
+def unlimited():
+    return RateLimiter("test")
+
+
+async def gather_timed(calls):
+    start = time.monotonic()
+    results = await asyncio.gather(*calls)
+    return results, time.monotonic() - start
+
+
+async def collect(chunks):
+    return "".join([chunk async for chunk in chunks])
+
+
+def test_sync_client_calls_overlap_on_the_thread_pool():
+    transport = LLMTransport(SyncClient(), limiter=unlimited())
+    assert not transport.is_async
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        results, elapsed = await gather_timed(transport.complete(f"p{index}") for index in range(CALLS))
+        ticking.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(run())
+    transport.close()
+    assert results == [f"sync:p{index}" for index in range(CALLS)]
+    assert elapsed < DELAY * CALLS / 2
+    # The event loop kept running while the blocking calls were in flight
+    assert ticks >= 5
+
+
+def test_async_client_calls_overlap():
+    client = AsyncClient()
+    transport = LLMTransport(client, limiter=unlimited())
+    assert transport.is_async
+
+    results, elapsed = asyncio.run(gather_timed(transport.complete(f"p{index}") for index in range(CALLS)))
+    assert results == [f"async:p{index}" for index in range(CALLS)]
+    assert elapsed < DELAY * CALLS / 2
+    assert client.peak == CALLS
+
+
+def test_max_concurrency_bounds_overlap():
+    client = AsyncClient()
+    transport = LLMTransport(client, max_concurrency=2, limiter=unlimited())
+    asyncio.run(gather_timed(transport.complete(f"p{index}") for index in range(CALLS)))
+    assert client.peak == 2
+
+
+def test_streams_overlap_and_record_usage():
+    transport = LLMTransport(AsyncClient(), limiter=unlimited())
+    results, elapsed = asyncio.run(gather_timed(collect(transport.stream(f"p{index}")) for index in range(CALLS)))
+    assert results == [f"streamed p{index} " for index in range(CALLS)]
+    assert elapsed < DELAY * CALLS / 2
+    assert transport.usage["input_tokens"] == 10 * CALLS
+
+
+def test_stream_falls_back_to_create_without_stream_support():
+    transport = LLMTransport(AsyncClient(streaming=False), limiter=unlimited())
+    assert asyncio.run(collect(transport.stream("p"))) == "async:p"
+
+
+def test_stream_backoff_does_not_hold_a_concurrency_slot():
+    limiter = unlimited()
+    limiter.backoff = lambda attempt: 3 * DELAY
+    transport = LLMTransport(AsyncClient(failures=1), max_concurrency=1, limiter=limiter)
+
+    async def run():
+        finished = {}
+
+        async def timed(name, call):
+            await call
+            finished[name] = time.monotonic() - start
+
+        start = time.monotonic()
+        await asyncio.gather(
+            timed("stream", collect(transport.stream("slow"))),
+            timed("complete", transport.complete("fast"))
+        )
+        return finished
+
+    finished = asyncio.run(run())
+    # The plain call used the only slot while the stream waited to retry
+    assert finished["complete"] < 3 * DELAY < finished["stream"]